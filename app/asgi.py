@@ -0,0 +1,73 @@
+# ----------- IMPORTS -----------
+# HTTP-level pieces Streamlit scripts can't do themselves (they only see the
+# websocket). Mounted around the app in server.py.
+from urllib.parse import parse_qs         # Version query on static URLs
+from starlette.concurrency import run_in_threadpool  # SQLite work off the event loop
+from starlette.datastructures import MutableHeaders  # Rewriting response headers
+from starlette.requests import Request    # Cookie parsing
+from app import session_store             # Server-issued session ids
+from app.repository import init_schema    # Session table may not exist before the first script run
+
+# ----------- CONSTANTS -----------
+# Streamlit's own endpoints; everything else is a page load that may need a session cookie
+INTERNAL_PREFIXES = ("/_stcore/", "/static/", "/app/static/", "/component/", "/media/", "/auth/")
+APP_STATIC_PREFIX = "/app/static/"
+# Versioned (?v=<content hash>) files never change, so browsers may keep them for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+# ----------- SESSION COOKIE -----------
+class SessionCookieMiddleware:
+    """Gives each browser a server-issued session id in an HttpOnly cookie.
+
+    A page load without a live issued id (none, expired, or made up by the client)
+    gets a fresh one; main.py reads it from st.context.cookies on the websocket.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or scope["path"].startswith(INTERNAL_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        token = Request(scope).cookies.get(session_store.COOKIE_NAME)
+        await run_in_threadpool(init_schema)
+        if await run_in_threadpool(session_store.is_issued, token):
+            await self.app(scope, receive, send)
+            return
+        token = await run_in_threadpool(session_store.issue_session_id)
+        cookie = session_store.cookie_header(token, secure=scope.get("scheme") == "https").encode("latin-1")
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+# ----------- STATIC CACHING -----------
+class StaticCacheMiddleware:
+    """Sends a long-lived Cache-Control for versioned app/static/ files.
+
+    Streamlit's static route sends none, so without this every avatar render
+    revalidates with the server.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(APP_STATIC_PREFIX) \
+                or "v" not in parse_qs(scope.get("query_string", b"").decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
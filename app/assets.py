@@ -0,0 +1,185 @@
+# ----------- IMPORTS -----------
+import base64                             # Data URIs
+import hashlib                            # Cache file names and version tags
+import ipaddress                          # Refusing private and link-local targets
+import json                               # Remote image metadata (ETag, freshness)
+import mimetypes                          # Data URI media types
+import os                                 # Asset files
+import tempfile                           # Staging downloads before publishing them
+import threading                          # Background fetches
+import socket                             # Resolving remote image hosts
+import time                               # Revalidation interval
+import urllib.error                       # Conditional GET responses
+import urllib.parse                       # Remote image hosts
+import urllib.request                     # Fetching remote images
+
+# ----------- CONSTANTS -----------
+# Streamlit serves the static/ folder next to main.py at app/static/... (.streamlit/config.toml);
+# app.asgi.StaticCacheMiddleware (server.py) makes ?v=<content hash> URLs cacheable for a year.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+STATIC_URL = "app/static"
+REMOTE_CACHE_DIR = os.path.join(STATIC_DIR, "remote")
+DEFAULT_AVATAR_PATH = os.path.join(STATIC_DIR, "default_avatar.svg")
+
+INLINE_MAX_BYTES = 4096                   # Smaller assets are inlined as data URIs (no request at all)
+REVALIDATE_SECONDS = 24 * 60 * 60         # Cached remote images are re-checked with If-None-Match this often
+FETCH_TIMEOUT_SECONDS = 5
+MAX_REMOTE_BYTES = 2 * 1024 * 1024
+# Extensions Streamlit's static route serves with their real content type
+REMOTE_TYPES = {"image/png": ".png", "image/jpeg": ".jpg", "image/gif": ".gif", "image/webp": ".webp"}
+# The server fetches these URLs itself, so only HTTPS on known avatar hosts is followed
+# (never a value that could point it at internal services).
+REMOTE_IMAGE_HOSTS = {host.strip().lower() for host in os.getenv(
+    "REMOTE_IMAGE_HOSTS",
+    "lh3.googleusercontent.com,avatars.githubusercontent.com,secure.gravatar.com,www.gravatar.com",
+).split(",") if host.strip()}
+
+_local_urls = {}                          # (path, mtime) -> data URI or versioned static URL
+_in_flight = set()                        # Remote URLs currently being fetched
+_lock = threading.Lock()
+
+
+# ----------- LOCAL ASSETS -----------
+def asset_url(path):
+    """A URL for a file under ./static: inlined as a data URI when tiny (or SVG, which
+    the static route won't serve as an image), else a versioned, cacheable static URL."""
+    key = (path, os.path.getmtime(path))
+    with _lock:
+        if key in _local_urls:
+            return _local_urls[key]
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) <= INLINE_MAX_BYTES or path.endswith(".svg"):
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        url = f"data:{media_type};base64,{base64.b64encode(data).decode('ascii')}"
+    else:
+        relative = os.path.relpath(path, STATIC_DIR).replace(os.sep, "/")
+        url = f"{STATIC_URL}/{relative}?v={hashlib.sha256(data).hexdigest()[:12]}"
+    with _lock:
+        _local_urls[key] = url
+    return url
+
+def default_avatar_url():
+    return asset_url(DEFAULT_AVATAR_PATH)
+
+
+# ----------- REMOTE IMAGES -----------
+def _allowed_host(url):
+    try:
+        parts = urllib.parse.urlsplit(url)
+    except ValueError:
+        return None
+    return parts if parts.scheme == "https" and parts.hostname in REMOTE_IMAGE_HOSTS else None
+
+def is_allowed_remote(url):
+    """True for an https URL on an allowed host that resolves only to public addresses."""
+    parts = _allowed_host(url)
+    if parts is None:
+        return False
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(parts.hostname, parts.port or 443)}
+    except (OSError, UnicodeError):
+        return False
+    return bool(addresses) and all(ipaddress.ip_address(address.split("%")[0]).is_global for address in addresses)
+
+
+class _CheckedRedirects(urllib.request.HTTPRedirectHandler):
+    """Follows a redirect only to another allowed URL."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if not is_allowed_remote(newurl):
+            raise urllib.error.HTTPError(newurl, code, "Redirect to a disallowed host", headers, fp)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+_opener = urllib.request.build_opener(_CheckedRedirects)
+
+def _cache_paths(url):
+    name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+    return os.path.join(REMOTE_CACHE_DIR, name), os.path.join(REMOTE_CACHE_DIR, f"{name}.json")
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_atomic(path, data):
+    fd, staging = tempfile.mkstemp(dir=REMOTE_CACHE_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(data)
+        os.replace(staging, path)
+    except BaseException:
+        os.unlink(staging)
+        raise
+
+def _fetch(url, meta):
+    """Downloads url, or revalidates the cached copy with If-None-Match / If-Modified-Since."""
+    base, meta_path = _cache_paths(url)
+    request = urllib.request.Request(url, headers={"User-Agent": "ResumeBot asset cache"})
+    if meta:
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+    if not is_allowed_remote(url):
+        return
+    try:
+        with _opener.open(request, timeout=FETCH_TIMEOUT_SECONDS) as response:
+            content_type = response.headers.get_content_type()
+            extension = REMOTE_TYPES.get(content_type)
+            data = response.read(MAX_REMOTE_BYTES + 1)
+            if extension is None or len(data) > MAX_REMOTE_BYTES:
+                return  # Not an image we can serve; the caller keeps using the fallback
+            os.makedirs(REMOTE_CACHE_DIR, exist_ok=True)
+            _write_atomic(base + extension, data)
+            meta = {
+                "file": os.path.basename(base + extension),
+                "version": hashlib.sha256(data).hexdigest()[:12],
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+    except urllib.error.HTTPError as e:
+        if e.code != 304 or not meta:
+            return
+        # 304 Not Modified: the cached copy is still current
+    except (urllib.error.URLError, OSError):
+        return  # Offline or unreachable: keep serving what we have
+    meta["checked_at"] = time.time()
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+def _fetch_in_background(url, meta):
+    with _lock:
+        if url in _in_flight:
+            return
+        _in_flight.add(url)
+
+    def run():
+        try:
+            _fetch(url, meta)
+        finally:
+            with _lock:
+                _in_flight.discard(url)
+
+    threading.Thread(target=run, name="asset-fetch", daemon=True).start()
+
+def remote_image_url(url, fallback):
+    """Serves a remote image from the local cache instead of hot-linking it.
+
+    Never blocks a render on the network: an uncached image returns fallback while
+    it downloads in the background, and a stale one keeps being served while it is
+    revalidated with its ETag. URLs off the REMOTE_IMAGE_HOSTS allow-list are
+    never fetched and get fallback.
+    """
+    if _allowed_host(url) is None:  # Checked again, with DNS, before each fetch
+        return fallback
+    _, meta_path = _cache_paths(url)
+    meta = _read_meta(meta_path)
+    cached = meta and os.path.exists(os.path.join(REMOTE_CACHE_DIR, meta["file"]))
+    if not cached:
+        _fetch_in_background(url, None)
+        return fallback
+    if time.time() - meta.get("checked_at", 0) > REVALIDATE_SECONDS:
+        _fetch_in_background(url, meta)
+    return f"{STATIC_URL}/remote/{meta['file']}?v={meta['version']}"
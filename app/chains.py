@@ -0,0 +1,197 @@
+# ----------- IMPORTS -----------
+import textwrap                           # Template indentation
+import threading                          # Guards the per-chain counters
+import time                               # Latency measurement
+from langchain.prompts import PromptTemplate  # LLM prompt templates
+from app.llm_cache import run_chain, arun_chain, stream_chain, astream_chain  # Memoized LLM calls
+
+# ----------- CONSTANTS -----------
+CHARS_PER_TOKEN = 4                       # Rough English average, used for token estimates
+
+
+# ----------- INSTRUMENTATION -----------
+def estimate_tokens(text):
+    """Cheap token estimate; good enough for budgets and trends, not for billing."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class Chain:
+    """A prompt template compiled once per process, with a version and call metrics.
+
+    `key` ("name@vN") identifies the chain to the cache and metrics layers; bump the
+    version whenever the template's meaning changes.
+    """
+
+    def __init__(self, name, version, template):
+        self.name, self.version = name, version
+        self.key = f"{name}@v{version}"
+        self.prompt = PromptTemplate.from_template(textwrap.dedent(template).strip())
+        self._template_tokens = estimate_tokens(self.prompt.template)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0,
+                       "first_token_seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    def _record(self, started, inputs, output, first_token_at=None, failed=False):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stats = self._stats
+            stats["calls"] += 1
+            stats["errors"] += failed
+            stats["total_seconds"] += elapsed
+            stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+            stats["first_token_seconds"] += (first_token_at or time.perf_counter()) - started
+            stats["prompt_tokens"] += self._template_tokens + sum(estimate_tokens(str(v)) for v in inputs.values())
+            stats["completion_tokens"] += estimate_tokens(output)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        calls = stats["calls"] or 1
+        stats["avg_seconds"] = stats["total_seconds"] / calls
+        stats["avg_first_token_seconds"] = stats.pop("first_token_seconds") / calls
+        return stats
+
+    def run(self, llm, **inputs):
+        started, output, failed = time.perf_counter(), "", True
+        try:
+            output = run_chain(llm, self.prompt, chain_key=self.key, **inputs)
+            failed = False
+            return output
+        finally:
+            self._record(started, inputs, output, failed=failed)
+
+    async def arun(self, llm, **inputs):
+        started, output, failed = time.perf_counter(), "", True
+        try:
+            output = await arun_chain(llm, self.prompt, chain_key=self.key, **inputs)
+            failed = False
+            return output
+        finally:
+            self._record(started, inputs, output, failed=failed)
+
+    def stream(self, llm, **inputs):
+        started, first_token_at, parts, failed = time.perf_counter(), None, [], True
+        try:
+            for chunk in stream_chain(llm, self.prompt, chain_key=self.key, **inputs):
+                first_token_at = first_token_at or time.perf_counter()
+                parts.append(chunk)
+                yield chunk
+            failed = False
+        finally:
+            self._record(started, inputs, "".join(parts), first_token_at, failed)
+
+    async def astream(self, llm, **inputs):
+        started, first_token_at, parts, failed = time.perf_counter(), None, [], True
+        try:
+            async for chunk in astream_chain(llm, self.prompt, chain_key=self.key, **inputs):
+                first_token_at = first_token_at or time.perf_counter()
+                parts.append(chunk)
+                yield chunk
+            failed = False
+        finally:
+            self._record(started, inputs, "".join(parts), first_token_at, failed)
+
+
+# ----------- REGISTRY -----------
+CHAINS = {}
+
+def register(name, version, template):
+    chain = Chain(name, version, template)
+    CHAINS[name] = chain
+    return chain
+
+def chain_stats():
+    """Returns one metrics row per registered chain, for this process."""
+    return [{"chain": chain.key, **chain.stats()} for chain in CHAINS.values()]
+
+
+INTERVIEW_QUESTIONS = register("interview_questions", 1, """
+    Based on the following resume, generate 10 relevant interview questions:
+    {resume_text}
+""")
+
+SKILL_EXTRACTION = register("skill_extraction", 1, """
+    Analyze the following resume text and extract technical skills in these categories:
+    - Programming Languages (Python, C, C++, Java, etc.)
+    - Web Development (HTML, CSS, JavaScript, Django, Flask, etc.)
+    - Databases (MySQL, SQL, PostgreSQL, etc.)
+    - Data Science, Machine Learning, or AI tools.
+
+    Return them as a comma-separated list only.
+    Resume Text:
+    {resume_text}
+""")
+
+CODING_QUESTIONS = register("coding_questions", 1, """
+    Generate 10 short, practical, and resume-based coding or SQL interview questions
+    based on these skills: {skills}.
+
+    Include:
+    - Basic logic programs (even/odd, factorial, palindrome)
+    - String or array handling
+    - File handling or exception handling (for Python/Java)
+    - SQL tasks (CREATE TABLE, INSERT, SELECT queries)
+    - Web-related small tasks (HTML/CSS/JS) if relevant
+
+    Each question should be skill-relevant and returned on a new line.
+""")
+
+ANSWER_FEEDBACK = register("answer_feedback", 1, """
+    Question: {question}
+    Candidate's Answer: {answer}
+    Provide professional feedback on relevance, clarity, and improvement.
+""")
+
+CODE_FEEDBACK = register("code_feedback", 1, """
+    Evaluate the candidate's code based on the given question and skills.
+    Provide detailed feedback covering:
+    - Logic correctness
+    - Code efficiency
+    - Readability and maintainability
+    - Suggestions for improvement
+
+    Skills: {skills}
+    Question: {question}
+    Candidate Code:
+    {code}
+""")
+
+TEST_CASES = register("test_cases", 1, """
+    Write 5 hidden test cases for the following programming question.
+    The program reads everything from standard input and prints its answer to standard output.
+    Cover normal inputs and edge cases.
+
+    Return ONLY a JSON array, where each item is an object with two string fields:
+    "input" (the exact stdin text) and "expected_output" (the exact expected stdout).
+
+    Question: {question}
+""")
+
+
+# ----------- CALLS -----------
+# One function per chain with its exact inputs, so a typo fails at the call site
+# instead of surfacing as a missing template variable inside LangChain.
+async def interview_questions_stream(llm, resume_text):
+    """Yields the interview question list as it is generated."""
+    async for chunk in INTERVIEW_QUESTIONS.astream(llm, resume_text=resume_text):
+        yield chunk
+
+async def extract_skills(llm, resume_text):
+    """Returns the resume's technical skills as a comma-separated string."""
+    return (await SKILL_EXTRACTION.arun(llm, resume_text=resume_text)).strip()
+
+async def coding_questions(llm, skills):
+    """Returns newline-separated coding and SQL questions for the skills."""
+    return await CODING_QUESTIONS.arun(llm, skills=skills)
+
+def answer_feedback(llm, question, answer):
+    """Yields feedback on a spoken or typed interview answer."""
+    return ANSWER_FEEDBACK.stream(llm, question=question, answer=answer)
+
+def code_feedback(llm, question, code, skills):
+    """Yields a review of the candidate's code."""
+    return CODE_FEEDBACK.stream(llm, question=question, code=code, skills=skills)
+
+def test_cases(llm, question):
+    """Returns the raw LLM response holding hidden test cases as a JSON array."""
+    return TEST_CASES.run(llm, question=question)
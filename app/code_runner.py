@@ -0,0 +1,388 @@
+# ----------- IMPORTS -----------
+import glob                               # Optional system directories for the sandbox
+import json                               # Job/result protocol with the workers
+import os                                 # Environment configuration and process groups
+import queue                              # Idle pre-started workers
+import shutil                             # Scratch directory cleanup
+import signal                             # Killing runaway process groups
+import subprocess                         # Out-of-process execution
+import sys                                # Default interpreter for the workers
+import tempfile                           # Per-run scratch directories
+import threading                          # Concurrency limits and pool refills
+from app.repository import DB_PATH        # Must stay out of the sandbox's reach
+
+try:
+    import pwd                            # POSIX only; "uid" isolation is unavailable elsewhere
+except ImportError:
+    pwd = None
+
+# ----------- CONSTANTS -----------
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # .env, databases, caches
+POOL_SIZE = int(os.getenv("CODE_RUNNER_WORKERS", "2"))        # Concurrent runs and warm workers
+MAX_QUEUED_RUNS = int(os.getenv("CODE_RUNNER_MAX_QUEUE", "8"))  # Runs allowed to wait for a worker
+MAX_RESULT_BYTES = 4 * 1024 * 1024        # Anything a worker writes beyond this is dropped
+RESULT_TEXT_FIELDS = ("status", "error", "stdout", "stderr")
+DEFAULT_LIMITS = {
+    "cpu_seconds": 2,
+    "memory_mb": 256,
+    "wall_seconds": 5,
+    "max_file_kb": 1024,
+    "max_output_chars": 20000,
+}
+
+
+# Candidate code must not be able to read the app (.env secrets, databases). "bwrap" runs
+# workers in a bubblewrap namespace that only sees system directories; "uid" runs them as
+# CODE_RUNNER_USER, which needs the app to start as root and the app directory to be
+# closed to that account. "auto" picks whichever works here. "none" is for local
+# development only; otherwise the runner refuses to run code without a working sandbox.
+ISOLATION = os.getenv("CODE_RUNNER_ISOLATION", "auto")
+SANDBOX_USER = os.getenv("CODE_RUNNER_USER", "nobody")
+# Interpreter for the workers; under "uid" it must be executable by CODE_RUNNER_USER
+SANDBOX_PYTHON = os.getenv("CODE_RUNNER_PYTHON", sys.executable)
+# Readable (never writable) inside every sandbox; compiled artifacts live here
+SHARED_DIR = os.getenv("CODE_RUNNER_SHARED_DIR", os.path.join(tempfile.gettempdir(), "resumebot-shared"))
+SYSTEM_DIRS = ["/usr", "/bin", "/sbin", "/lib", "/lib32", "/lib64", "/etc/alternatives", "/etc/ld.so.cache"]
+# Succeeds only if none of the given paths can be opened or listed
+PROBE_SOURCE = """
+import os, sys
+for path in sys.argv[1:]:
+    try:
+        os.listdir(path) if os.path.isdir(path) else open(path, "rb").close()
+    except OSError:
+        continue
+    sys.exit(1)
+"""
+
+with open(WORKER_SCRIPT, encoding="utf-8") as _f:
+    WORKER_SOURCE = _f.read()  # Passed with -c, so the sandbox needs no access to this directory
+
+_isolation = None                         # (mode or None, reason) once resolved
+_isolation_lock = threading.Lock()
+_idle_workers = queue.Queue()
+_run_slots = threading.BoundedSemaphore(POOL_SIZE)
+_state_lock = threading.Lock()
+_refill_lock = threading.Lock()
+_queued_runs = 0
+
+
+# ----------- ISOLATION -----------
+def _sandbox_ids():
+    entry = pwd.getpwnam(SANDBOX_USER)
+    return entry.pw_uid, entry.pw_gid
+
+def _user_exists():
+    try:
+        _sandbox_ids()
+    except KeyError:
+        return False
+    return True
+
+def sandboxed(argv, writable_dir, mode=None):
+    """Returns (argv, Popen keyword arguments) that run argv in the sandbox.
+
+    writable_dir is the only place the sandboxed process may write to besides
+    its private /tmp; it becomes the working directory.
+    """
+    mode = mode or isolation()[0]
+    if mode == "bwrap":
+        wrapper = ["bwrap", "--unshare-all", "--die-with-parent", "--proc", "/proc", "--dev", "/dev",
+                   "--tmpfs", "/tmp"]
+        read_only = SYSTEM_DIRS + glob.glob("/etc/java-*") + [os.path.dirname(os.path.dirname(os.path.realpath(SANDBOX_PYTHON))), SHARED_DIR]
+        for path in dict.fromkeys(read_only):
+            wrapper += ["--ro-bind-try", path, path]
+        wrapper += ["--bind", writable_dir, writable_dir, "--chdir", writable_dir, "--"]
+        return wrapper + list(argv), {"cwd": writable_dir}
+    if mode == "uid":
+        uid, gid = _sandbox_ids()
+        os.chown(writable_dir, uid, gid)
+        return list(argv), {"cwd": writable_dir, "user": uid, "group": gid, "extra_groups": []}
+    return list(argv), {"cwd": writable_dir}
+
+def _probe(mode):
+    """Runs the interpreter in the sandbox; returns why it isn't usable, or None."""
+    scratch = tempfile.mkdtemp(prefix="resumebot-probe-")
+    try:
+        argv, options = sandboxed([SANDBOX_PYTHON, "-I", "-c", PROBE_SOURCE, APP_ROOT,
+                                   os.path.abspath(DB_PATH)], scratch, mode)
+        returncode = subprocess.run(argv, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.DEVNULL, timeout=30, **options).returncode
+    except (OSError, subprocess.SubprocessError) as e:
+        return f"the {mode} sandbox can't start {SANDBOX_PYTHON} ({e})"
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    if returncode == 1:
+        return f"the {mode} sandbox can still read {APP_ROOT} or the database"
+    if returncode != 0:
+        return f"{SANDBOX_PYTHON} failed in the {mode} sandbox (exit code {returncode})"
+    return None
+
+def _resolve_isolation():
+    modes = {"auto": ["bwrap", "uid"], "bwrap": ["bwrap"], "uid": ["uid"], "none": ["none"]}.get(ISOLATION)
+    if modes is None:
+        return None, f"Unknown CODE_RUNNER_ISOLATION {ISOLATION!r}; use auto, bwrap, uid or none."
+    problems = []
+    for mode in modes:
+        if mode == "none":
+            return mode, ""
+        if mode == "bwrap" and not shutil.which("bwrap"):
+            problems.append("bubblewrap (bwrap) is not installed")
+        elif mode == "uid" and (pwd is None or os.geteuid() != 0):
+            problems.append("running as another user needs the app to start as root")
+        elif mode == "uid" and not _user_exists():
+            problems.append(f"user {SANDBOX_USER!r} does not exist")
+        else:
+            problem = _probe(mode)
+            if problem is None:
+                return mode, ""
+            problems.append(problem)
+    return None, "Code execution is disabled: no sandbox is available (" + "; ".join(problems) + ")."
+
+def isolation():
+    """Returns (mode, "") for the sandbox in use, or (None, reason) when code must not run."""
+    global _isolation
+    with _isolation_lock:
+        if _isolation is None:
+            _isolation = _resolve_isolation()
+            if _isolation[0] is not None:
+                os.makedirs(SHARED_DIR, exist_ok=True)
+                os.chmod(SHARED_DIR, 0o711)  # Enterable, not listable: artifacts are found by hash only
+        return _isolation
+
+
+# ----------- WORKER POOL -----------
+def _spawn_worker():
+    """Starts an interpreter that blocks on stdin until it is handed a job.
+
+    Returns (proc, workdir, result_fd, stderr_file). The worker reports on its own
+    pipe, not stdout, so nothing the candidate's code prints can pass for a result.
+    stderr goes to a file (capped by RLIMIT_FSIZE) so a process the code leaves
+    behind can't hold a pipe open and stall the run.
+    """
+    workdir = tempfile.mkdtemp(prefix="resumebot-run-")
+    stderr_file = tempfile.TemporaryFile()
+    result_fd, write_fd = os.pipe()
+    try:
+        argv, options = sandboxed([SANDBOX_PYTHON, "-I", "-c", WORKER_SOURCE, str(write_fd)], workdir)
+        proc = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr_file,
+            pass_fds=(write_fd,),
+            env={"PATH": os.environ.get("PATH", ""), "PYTHONIOENCODING": "utf-8"},
+            start_new_session=(os.name == "posix"),
+            **options,
+        )
+    except BaseException:
+        os.close(result_fd)
+        stderr_file.close()
+        raise
+    finally:
+        os.close(write_fd)
+    return proc, workdir, result_fd, stderr_file
+
+def _discard_worker(proc, workdir, result_fd, stderr_file):
+    if proc.poll() is None:
+        _kill(proc)
+    os.close(result_fd)
+    stderr_file.close()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+def _take_worker():
+    while True:
+        try:
+            worker = _idle_workers.get_nowait()
+        except queue.Empty:
+            return _spawn_worker()
+        if worker[0].poll() is None:
+            return worker
+        _discard_worker(*worker)
+
+def _refill_pool():
+    if isolation()[0] is None:
+        return
+    if not _refill_lock.acquire(blocking=False):
+        return  # Another thread is already topping the pool up
+    try:
+        while _idle_workers.qsize() < POOL_SIZE:
+            _idle_workers.put(_spawn_worker())
+    finally:
+        _refill_lock.release()
+
+def warm_pool():
+    """Pre-starts POOL_SIZE workers in the background so the first run skips interpreter startup."""
+    threading.Thread(target=_refill_pool, name="code-runner-refill", daemon=True).start()
+
+def _kill_group(proc):
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)  # Also takes down anything the code spawned
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+def _kill(proc):
+    _kill_group(proc)
+    proc.wait()
+
+def _drain(result_fd, chunks):
+    # Read while the worker runs: a result bigger than the pipe buffer would otherwise block it
+    size = 0
+    with os.fdopen(result_fd, "rb", buffering=0) as pipe:
+        for block in iter(lambda: pipe.read(65536), b""):
+            if size < MAX_RESULT_BYTES:
+                chunks.append(block)
+                size += len(block)
+
+
+# ----------- EXECUTION -----------
+def _result(status, error="", stdout="", stderr="", time_ms=None, peak_memory_kb=None):
+    return {
+        "status": status,
+        "stdout": stdout,
+        "stderr": stderr,
+        "error": error,
+        "time_ms": time_ms,
+        "peak_memory_kb": peak_memory_kb,
+    }
+
+def _parse_worker_output(proc, out, err, limits):
+    lines = out.decode("utf-8", "replace").strip().splitlines()
+    if lines:
+        try:
+            result = json.loads(lines[-1])
+        except ValueError:
+            result = None
+        # Written by the candidate's process, so only the expected fields and types are kept
+        if isinstance(result, dict) and all(isinstance(result.get(key), str) for key in RESULT_TEXT_FIELDS):
+            numbers = {key: result.get(key) if isinstance(result.get(key), (int, float)) else None
+                       for key in ("time_ms", "peak_memory_kb")}
+            return _result(**{key: result[key] for key in RESULT_TEXT_FIELDS}, **numbers)
+    if proc.returncode == -getattr(signal, "SIGXCPU", 24) or proc.returncode == -signal.SIGKILL:
+        return _result("cpu_limit", f"CPU time limit of {limits['cpu_seconds']}s exceeded.")
+    if proc.returncode == -getattr(signal, "SIGXFSZ", 25):
+        return _result("file_limit", f"File size limit of {limits['max_file_kb']} KB exceeded.")
+    return _result("crashed", f"Runner exited unexpectedly (code {proc.returncode}).",
+                   stderr=err.decode("utf-8", "replace")[-limits["max_output_chars"]:])
+
+def _execute(job, limits):
+    proc, workdir, result_fd, stderr_file = _take_worker()
+    chunks = []
+    reader = threading.Thread(target=_drain, args=(result_fd, chunks), daemon=True)
+    reader.start()
+    payload = json.dumps({**job, "limits": limits}).encode("utf-8")
+    try:
+        try:
+            proc.stdin.write(payload)  # The worker reads its whole job before running anything
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass  # Died before reading; reported from its exit status below
+        proc.wait(timeout=limits["wall_seconds"])
+    except subprocess.TimeoutExpired:
+        _kill(proc)
+        return _result("timeout", f"Wall-clock limit of {limits['wall_seconds']}s exceeded.",
+                       time_ms=limits["wall_seconds"] * 1000)
+    finally:
+        _kill_group(proc)  # Background processes left behind would keep the result pipe open
+        reader.join(timeout=1)
+        stderr_file.seek(0)
+        err = stderr_file.read()
+        stderr_file.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+        warm_pool()
+    return _parse_worker_output(proc, b"".join(chunks), err, limits)
+
+def _admit(work):
+    """Runs work() once a worker slot is free, or rejects it as busy when too many wait."""
+    global _queued_runs
+    mode, reason = isolation()
+    if mode is None:
+        return _result("unsupported", reason)
+    with _state_lock:
+        if _queued_runs >= MAX_QUEUED_RUNS:
+            return _result("busy", "The code runner is busy. Please try again in a moment.")
+        _queued_runs += 1
+    try:
+        _run_slots.acquire()
+    finally:
+        with _state_lock:
+            _queued_runs -= 1
+
+    try:
+        return work()
+    finally:
+        _run_slots.release()
+
+def _submit(job, limits):
+    limits = {**DEFAULT_LIMITS, **limits}
+    return _admit(lambda: _execute(job, limits))
+
+def run_python(code, input_data="", **limits):
+    """Runs Python code in an isolated worker process and returns its captured result.
+
+    The result dict holds status ("ok", "error", "timeout", "cpu_limit",
+    "memory_limit", "file_limit", "crashed", "busy" or "unsupported" when no
+    sandbox is available), stdout, stderr, error,
+    time_ms and peak_memory_kb. Runs beyond POOL_SIZE wait for a free worker;
+    once MAX_QUEUED_RUNS are already waiting, new runs are turned away as "busy".
+    """
+    return _submit({"code": code, "input": input_data}, limits)
+
+def run_command(argv, input_data="", **limits):
+    """Runs a program (e.g. a compiled binary) under the same limits, pool and result format."""
+    return _submit({"argv": list(argv), "input": input_data}, limits)
+
+def normalize_output(text):
+    """Ignores trailing whitespace on each line and trailing blank lines."""
+    return "\n".join(line.rstrip() for line in text.strip("\n").splitlines()).rstrip()
+
+def _grade_cases(program, cases, stop_on_failure, limits):
+    results, passed, total_ms, peaks = [], 0, 0.0, []
+    for index, case in enumerate(cases, 1):
+        run = _execute({**program, "input": case["input"]}, limits)
+        ok = run["status"] == "ok" and normalize_output(run["stdout"]) == normalize_output(case["expected_output"])
+        passed += ok
+        total_ms += run["time_ms"] or 0.0
+        if run["peak_memory_kb"] is not None:
+            peaks.append(run["peak_memory_kb"])
+        results.append({
+            "case": index,
+            "passed": ok,
+            "status": run["status"] if run["status"] != "ok" else ("passed" if ok else "wrong_answer"),
+            "error": run["error"],
+            "stdout": run["stdout"],
+            "stderr": run["stderr"],
+            "time_ms": run["time_ms"] or 0.0,
+        })
+        if not ok and stop_on_failure:
+            break
+    return {
+        "status": "ok",
+        "cases": results,
+        "passed": passed,
+        "total": len(cases),
+        "time_ms": total_ms,
+        "peak_memory_kb": max(peaks, default=None),
+    }
+
+def grade(cases, stop_on_failure=False, code=None, argv=None, **limits):
+    """Runs a Python program (code) or binary (argv) against every test case.
+
+    cases is a list of {"input", "expected_output"} dicts. Each case runs in its own
+    warm worker that is handed only the input; outputs are compared here, so the
+    candidate's code can neither read the expected outputs nor report its own score.
+    The result holds "cases" (per-case pass/fail, status, output and time_ms),
+    "passed", "total" and the summed "time_ms". The batch holds one worker slot
+    while its cases run, so it is admitted (or turned away as busy) as a whole.
+    """
+    program = {"argv": list(argv)} if argv is not None else {"code": code}
+    cases = list(cases)
+    limits = {**DEFAULT_LIMITS, **limits}
+    return _admit(lambda: _grade_cases(program, cases, stop_on_failure, limits))
+
+
+# Workers are started once per server process, when the module is first imported
+warm_pool()
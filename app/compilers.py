@@ -0,0 +1,237 @@
+# ----------- IMPORTS -----------
+import hashlib                            # Artifact cache keys
+import os                                 # Artifact directories
+import shutil                             # Compiler lookup and cache eviction
+import signal                             # Recognizing compilers killed by a limit
+import subprocess                         # Running the compilers
+import tempfile                           # Staging builds before publishing them
+import threading                          # One build per cache key at a time
+import time                               # Eviction grace period
+from app.code_runner import run_python, run_command, isolation, sandboxed, SHARED_DIR  # Sandboxed execution
+
+try:
+    import resource                       # POSIX only; compiler limits are skipped elsewhere
+except ImportError:
+    resource = None
+
+# ----------- CONSTANTS -----------
+# Compiled artifacts, one directory per cache key; inside the directory every sandbox can read
+BUILD_CACHE_PATH = os.path.join(SHARED_DIR, "builds")
+MAX_CACHED_BUILDS = 200                   # Least recently used artifacts beyond this are removed
+EVICTION_GRACE_SECONDS = 10 * 60          # Artifacts used more recently than this are never removed (may be running)
+COMPILE_TIMEOUT_SECONDS = 30
+COMPILE_CPU_SECONDS = 20                  # CPU time per compile (template/constexpr bombs)
+COMPILER_MEMORY_MB = 1024                 # Address space per compile, unless the runner sets compile_memory_mb
+MAX_ARTIFACT_MB = 64                      # Largest file a compiler may write (huge static arrays etc.)
+# Compiles run on the caller's (Streamlit script) thread, outside the code_runner pool,
+# so they get their own cap; a build that can't start within the wait is turned away as busy
+MAX_PARALLEL_COMPILES = int(os.getenv("MAX_PARALLEL_COMPILES", "2"))
+COMPILE_QUEUE_WAIT_SECONDS = 30
+BUILD_LOCK_STRIPES = 64                   # Fixed set of build locks, shared by hashing the cache key
+
+# Each runner names its source file, an optional compile command and a run command.
+# "{src}", "{build}" and "{bin}" are filled in with absolute paths inside the artifact directory.
+RUNNERS = {
+    "C": {
+        "source": "main.c",
+        "compile": ["gcc", "-O2", "-std=c11", "-o", "{bin}", "{src}", "-lm"],
+        "run": ["{bin}"],
+    },
+    "C++": {
+        "source": "main.cpp",
+        "compile": ["g++", "-O2", "-std=c++17", "-o", "{bin}", "{src}"],
+        "run": ["{bin}"],
+    },
+    "Java": {
+        "source": "Main.java",
+        "compile": ["javac", "-J-Xmx512m", "-d", "{build}", "{src}"],
+        "run": ["java", "-Xmx256m", "-Xss16m", "-cp", "{build}", "Main"],
+        # The JVM reserves far more address space than it uses, so memory is capped with -Xmx instead
+        "limits": {"memory_mb": None, "cpu_seconds": 4, "wall_seconds": 10},
+        "compile_memory_mb": None,  # javac is a JVM too; its heap is capped with -J-Xmx
+    },
+    "JavaScript": {
+        "source": "main.js",
+        "compile": None,
+        "run": ["node", "--max-old-space-size=256", "{src}"],
+        "limits": {"memory_mb": None},
+    },
+}
+
+_build_locks = [threading.Lock() for _ in range(BUILD_LOCK_STRIPES)]
+_compile_slots = threading.BoundedSemaphore(MAX_PARALLEL_COMPILES)
+
+
+class CompilerBusy(Exception):
+    """Every compile slot stayed taken for COMPILE_QUEUE_WAIT_SECONDS."""
+
+
+# ----------- ARTIFACT CACHE -----------
+def build_key(language, source):
+    """Hashes (language, compiler command and flags, source) into an artifact cache key."""
+    runner = RUNNERS[language]
+    digest = hashlib.sha256()
+    for part in (language, " ".join(runner["compile"] or []), source):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def _fill(args, paths):
+    return [arg.format(**paths) for arg in args]
+
+def _paths(artifact_dir, runner):
+    artifact_dir = os.path.abspath(artifact_dir)
+    return {
+        "build": artifact_dir,
+        "src": os.path.join(artifact_dir, runner["source"]),
+        "bin": os.path.join(artifact_dir, "main"),
+    }
+
+def _lock_for(key):
+    # Striped: memory stays constant however many distinct sources are built
+    return _build_locks[int(key[:8], 16) % BUILD_LOCK_STRIPES]
+
+def _evict_old_builds():
+    entries = [os.path.join(BUILD_CACHE_PATH, name) for name in os.listdir(BUILD_CACHE_PATH)
+               if not name.startswith(".")]
+    if len(entries) <= MAX_CACHED_BUILDS:
+        return
+    entries.sort(key=os.path.getmtime)
+    # build() refreshes the mtime of every artifact it hands out, so anything inside the
+    # grace period may be about to run (or running) and is left for a later pass
+    cutoff = time.time() - EVICTION_GRACE_SECONDS
+    for path in entries[:len(entries) - MAX_CACHED_BUILDS]:
+        try:
+            if os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass  # Removed concurrently
+
+def _seal(artifact_dir):
+    # Back to the app's ownership so sandboxed runs can read and execute but never modify it
+    for root, dirs, files in os.walk(artifact_dir):
+        for path in [root] + [os.path.join(root, name) for name in files]:
+            if hasattr(os, "chown"):
+                os.chown(path, os.getuid(), os.getgid(), follow_symlinks=False)
+            if not os.path.islink(path):
+                executable = os.path.isdir(path) or os.access(path, os.X_OK)
+                os.chmod(path, (0o711 if os.path.isdir(path) else 0o755) if executable else 0o644)
+
+def _compiler_limits(memory_mb):
+    def apply():
+        # Runs in the compiler process: a crafted source can't write an unbounded
+        # artifact or spend unbounded memory and CPU time
+        size = MAX_ARTIFACT_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_FSIZE, (size, size))
+        resource.setrlimit(resource.RLIMIT_CPU, (COMPILE_CPU_SECONDS, COMPILE_CPU_SECONDS + 1))
+        if memory_mb is not None:
+            memory = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    return apply
+
+def _compile(runner, paths, staging):
+    """Runs the compiler in the sandbox and returns its error output, or None on success."""
+    # Compilers run in the sandbox too: #include "/path/to/.env" must not echo secrets
+    argv, options = sandboxed(_fill(runner["compile"], paths), staging)
+    limits = _compiler_limits(runner.get("compile_memory_mb", COMPILER_MEMORY_MB)) if resource else None
+    if not _compile_slots.acquire(timeout=COMPILE_QUEUE_WAIT_SECONDS):
+        raise CompilerBusy()
+    try:
+        proc = subprocess.run(argv, capture_output=True, text=True, timeout=COMPILE_TIMEOUT_SECONDS,
+                              env={"PATH": os.environ.get("PATH", "")}, preexec_fn=limits, **options)
+    except subprocess.TimeoutExpired:
+        return f"Compilation timed out after {COMPILE_TIMEOUT_SECONDS}s."
+    finally:
+        _compile_slots.release()
+    if proc.returncode in (-getattr(signal, "SIGXCPU", 24), -signal.SIGKILL):
+        return f"Compilation exceeded its CPU time limit of {COMPILE_CPU_SECONDS}s."
+    if proc.returncode != 0:
+        return proc.stderr or "Compilation failed."
+    return None
+
+def build(language, source):
+    """Returns (artifact_dir, compile_error) for source, compiling only on a cache miss.
+
+    Failed builds are cached too, so re-running broken code with new input
+    reports the same compiler error without invoking the compiler again.
+    Raises CompilerBusy when no compile slot frees up in time.
+    """
+    runner = RUNNERS[language]
+    key = build_key(language, source)
+    artifact_dir = os.path.join(BUILD_CACHE_PATH, key)
+    error_path = os.path.join(artifact_dir, "compile_error.txt")
+
+    with _lock_for(key):
+        if not os.path.isdir(artifact_dir):
+            os.makedirs(BUILD_CACHE_PATH, mode=0o711, exist_ok=True)
+            staging = tempfile.mkdtemp(prefix=".staging-", dir=BUILD_CACHE_PATH)
+            paths = _paths(staging, runner)
+            with open(paths["src"], "w", encoding="utf-8") as f:
+                f.write(source)
+            if runner["compile"]:
+                try:
+                    compile_error = _compile(runner, paths, staging)
+                except CompilerBusy:
+                    shutil.rmtree(staging, ignore_errors=True)  # Not a result; nothing is cached
+                    raise
+                if compile_error is not None:
+                    compile_error = compile_error.replace(paths["build"] + os.sep, "")  # Hide staging paths
+                    with open(os.path.join(staging, "compile_error.txt"), "w", encoding="utf-8") as f:
+                        f.write(compile_error)
+            _seal(staging)
+            try:
+                os.rename(staging, artifact_dir)  # Publish atomically
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)  # Another process published it first
+            _evict_old_builds()
+        else:
+            os.utime(artifact_dir)  # Mark as recently used
+
+    if os.path.exists(error_path):
+        with open(error_path, encoding="utf-8") as f:
+            return artifact_dir, f.read() or "Compilation failed."
+    return artifact_dir, None
+
+
+# ----------- RUNNING -----------
+def missing_tool(language):
+    """Returns the name of the compiler/runtime that isn't installed, or None."""
+    runner = RUNNERS[language]
+    for command in (runner["compile"], runner["run"]):
+        if command and not command[0].startswith("{") and shutil.which(command[0]) is None:
+            return command[0]
+    return None
+
+def _failure(status, error, stderr=""):
+    return {"status": status, "error": error, "stdout": "", "stderr": stderr,
+            "time_ms": None, "peak_memory_kb": None}
+
+def prepare(language, source):
+    """Builds source (once) and returns (argv, limits, None), or (None, None, failure_result)."""
+    if language not in RUNNERS:
+        return None, None, _failure("unsupported", f"Running {language} code is not supported.")
+    tool = missing_tool(language)
+    if tool:
+        return None, None, _failure("unsupported", f"`{tool}` is not installed on this server.")
+
+    mode, reason = isolation()
+    if mode is None:
+        return None, None, _failure("unsupported", reason)
+
+    runner = RUNNERS[language]
+    try:
+        artifact_dir, compile_error = build(language, source)
+    except CompilerBusy:
+        return None, None, _failure("busy", "The code runner is busy. Please try again in a moment.")
+    if compile_error:
+        return None, None, _failure("compile_error", "Compilation failed.", compile_error)
+    return _fill(runner["run"], _paths(artifact_dir, runner)), runner.get("limits", {}), None
+
+def run_code(language, source, input_data="", **limits):
+    """Builds (once) and runs source in the sandboxed runner, returning a code_runner result."""
+    if language == "Python":
+        return run_python(source, input_data, **limits)
+    argv, runner_limits, failure = prepare(language, source)
+    if failure:
+        return failure
+    return run_command(argv, input_data, **{**runner_limits, **limits})
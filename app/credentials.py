@@ -0,0 +1,231 @@
+# ----------- IMPORTS -----------
+import argparse                           # Benchmark command-line interface
+import base64                             # Encoding salts and hashes for storage
+import hashlib                            # scrypt KDF and legacy SHA-256
+import hmac                               # Constant-time comparisons and cache keys
+import os                                 # Salts, secrets and environment configuration
+import re                                 # Recognizing legacy hashes
+import threading                          # Guards the in-process caches
+import time                               # Cache expiry and benchmarking
+from app import repository                # Pooled user storage
+
+# ----------- CONSTANTS -----------
+# scrypt cost parameters. Memory per hash is 128 * N * R bytes (16 MB at the defaults);
+# run `python -m app.credentials --benchmark` to see logins/sec per core for each N.
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+VERIFIED_CACHE_TTL = 10 * 60              # Seconds a successful check skips the KDF for the same credentials
+SESSION_TTL = 30 * 60                     # Idle seconds before a session must log in again
+AUTH_TOKEN_BACKEND = os.getenv("AUTH_TOKEN_BACKEND", "sqlite")  # "sqlite" (shared by replicas) or "memory"
+MAX_MEMORY_TOKENS = 10000                 # Expired logins are swept once the in-process table is this big
+PURGE_EVERY_ISSUES = 200                  # How often the SQLite backend deletes expired logins
+LEGACY_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+_process_secret = os.urandom(32)          # Keys the verified cache; never leaves this process
+_verified = {}                            # HMAC(email, password) -> (stored hash, expires at)
+_lock = threading.Lock()
+
+
+# ----------- HASHING -----------
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r, dklen=HASH_BYTES)
+
+def hash_password(password, n=None, r=None, p=None):
+    """Returns a self-describing salted scrypt hash: scrypt$N$r$p$salt$hash."""
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    salt = os.urandom(SALT_BYTES)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+def verify_password(password, stored):
+    """Checks password against a scrypt hash or a legacy unsalted SHA-256 hex digest."""
+    if not stored:
+        return False
+    if stored.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, expected = stored.split("$")
+            actual = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+        except ValueError:
+            return False
+        return hmac.compare_digest(actual, base64.b64decode(expected))
+    if LEGACY_SHA256.match(stored):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), stored)
+    return False
+
+def needs_rehash(stored):
+    """True for legacy hashes and for scrypt hashes made with outdated cost parameters."""
+    return not stored.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+
+# ----------- VERIFIED CACHE -----------
+def _cache_key(email, password):
+    return hmac.new(_process_secret, f"{email}\0{password}".encode(), hashlib.sha256).digest()
+
+def _recently_verified(email, password, stored):
+    with _lock:
+        entry = _verified.get(_cache_key(email, password))
+    # Tied to the stored hash, so a password change invalidates the entry
+    return entry is not None and entry[0] == stored and entry[1] > time.monotonic()
+
+def _remember_verified(email, password, stored):
+    now = time.monotonic()
+    with _lock:
+        if len(_verified) > 10000:
+            for key in [k for k, (_, expires) in _verified.items() if expires <= now]:
+                del _verified[key]
+        _verified[_cache_key(email, password)] = (stored, now + VERIFIED_CACHE_TTL)
+
+
+# ----------- AUTHENTICATION -----------
+def authenticate(email, password):
+    """Returns (username, email, phone, profile_picture) for valid credentials, else None.
+
+    Legacy or outdated hashes are transparently upgraded after a successful check.
+    """
+    row = repository.find_user_by_email(email)
+    if row is None:
+        return None
+    stored = row[4]
+    if not _recently_verified(email, password, stored):
+        if not verify_password(password, stored):
+            return None
+        if needs_rehash(stored):
+            stored = hash_password(password)
+            repository.update_password(email, stored)
+        _remember_verified(email, password, stored)
+    return row[:4]
+
+def set_password(email, password):
+    repository.update_password(email, hash_password(password))
+
+
+# ----------- LOGIN SESSIONS -----------
+# A login is bound to the browser's session id (the HttpOnly cookie from
+# app.session_store). Only a SHA-256 of the id is stored, so a leaked table can't be replayed.
+class MemoryTokenBackend:
+    """token hash -> (email, expires at) in this process; not shared between replicas."""
+
+    def __init__(self, max_tokens=MAX_MEMORY_TOKENS):
+        self.max_tokens = max_tokens
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def add(self, token_hash, email, expires_at):
+        now = time.time()
+        with self._lock:
+            if len(self._tokens) >= self.max_tokens:
+                for key in [k for k, (_, expires) in self._tokens.items() if expires <= now]:
+                    del self._tokens[key]
+            self._tokens[token_hash] = (email, expires_at)
+
+    def touch(self, token_hash, now, ttl):
+        with self._lock:
+            entry = self._tokens.get(token_hash)
+            if entry is None or entry[1] <= now:
+                self._tokens.pop(token_hash, None)
+                return None
+            self._tokens[token_hash] = (entry[0], now + ttl)
+            return entry[0]
+
+    def delete(self, token_hash):
+        with self._lock:
+            self._tokens.pop(token_hash, None)
+
+
+class SQLiteTokenBackend:
+    """One row per live token in the main database, so any replica can check a session."""
+
+    def __init__(self):
+        self._issues = 0
+
+    def add(self, token_hash, email, expires_at):
+        with repository.connection() as conn:
+            conn.execute("INSERT INTO auth_tokens (token_hash, email, expires_at) VALUES (?, ?, ?) "
+                         "ON CONFLICT(token_hash) DO UPDATE SET email=excluded.email, expires_at=excluded.expires_at",
+                         (token_hash, email, expires_at))
+            self._issues += 1
+            if self._issues % PURGE_EVERY_ISSUES == 0:
+                conn.execute("DELETE FROM auth_tokens WHERE expires_at <= ?", (time.time(),))
+
+    def touch(self, token_hash, now, ttl):
+        with repository.connection() as conn:
+            row = conn.execute("SELECT email, expires_at FROM auth_tokens WHERE token_hash=?",
+                               (token_hash,)).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            # Slide the expiry at most every half TTL instead of writing on every rerun
+            if row[1] - now < ttl / 2:
+                conn.execute("UPDATE auth_tokens SET expires_at=? WHERE token_hash=?", (now + ttl, token_hash))
+            return row[0]
+
+    def delete(self, token_hash):
+        with repository.connection() as conn:
+            conn.execute("DELETE FROM auth_tokens WHERE token_hash=?", (token_hash,))
+
+
+_token_backend = None
+
+def get_token_backend():
+    global _token_backend
+    with _lock:
+        if _token_backend is None:
+            _token_backend = MemoryTokenBackend() if AUTH_TOKEN_BACKEND == "memory" else SQLiteTokenBackend()
+        return _token_backend
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def bind_login(session_id, email):
+    """Records that session_id logged in as email; call only after checking a password or OTP."""
+    get_token_backend().add(_token_hash(session_id), email, time.time() + SESSION_TTL)
+
+def session_email(session_id):
+    """Returns the email logged in on session_id, sliding its expiry, or None."""
+    if not session_id or not isinstance(session_id, str):
+        return None
+    return get_token_backend().touch(_token_hash(session_id), time.time(), SESSION_TTL)
+
+def end_login(session_id):
+    if session_id and isinstance(session_id, str):
+        get_token_backend().delete(_token_hash(session_id))
+
+
+# ----------- BENCHMARK -----------
+def benchmark(costs=(2 ** 12, 2 ** 13, 2 ** 14, 2 ** 15, 2 ** 16), seconds=1.0):
+    """Measures single-core password verifications per second for each scrypt N."""
+    results = []
+    for n in costs:
+        stored = hash_password("benchmark-password", n=n)
+        count, started = 0, time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            verify_password("benchmark-password", stored)
+            count += 1
+        elapsed = time.perf_counter() - started
+        results.append({
+            "n": n,
+            "memory_mb": 128 * n * SCRYPT_R / 2 ** 20,
+            "ms_per_login": elapsed * 1000 / count,
+            "logins_per_sec": count / elapsed,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Password hashing utilities.")
+    parser.add_argument("--benchmark", action="store_true", help="Report logins/sec per core for each cost")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time spent measuring each cost")
+    args = parser.parse_args()
+    if args.benchmark:
+        print(f"scrypt r={SCRYPT_R} p={SCRYPT_P} (current N={SCRYPT_N})")
+        print(f"{'N':>8} {'memory':>9} {'ms/login':>9} {'logins/s/core':>14}")
+        for row in benchmark(seconds=args.seconds):
+            print(f"{row['n']:>8} {row['memory_mb']:>7.0f}MB {row['ms_per_login']:>9.1f} {row['logins_per_sec']:>14.1f}")
+    else:
+        parser.print_help()
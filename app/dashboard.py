@@ -1,55 +1,34 @@
-import hashlib
 import streamlit as st
-import sqlite3
-import os
-from PIL import Image
-
-PROFILE_PICTURE_PATH = './profile_pictures/'
+from app import repository, credentials, images
 
 def update_password(new_password):
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    hashed = hashlib.sha256(new_password.encode()).hexdigest()
-    c.execute("UPDATE users SET password=? WHERE email=?", (hashed, st.session_state.email))
-    conn.commit()
-    conn.close()
+    credentials.set_password(st.session_state.email, new_password)
 
 def update_phone(new_phone):
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    c.execute("UPDATE users SET phone=? WHERE email=?", (new_phone, st.session_state.email))
-    conn.commit()
-    conn.close()
+    repository.update_phone(st.session_state.email, new_phone)
     st.session_state.phone = new_phone
 
 def upload_profile_picture(email):
-    if not os.path.exists(PROFILE_PICTURE_PATH):
-        os.makedirs(PROFILE_PICTURE_PATH)
-
     uploaded_file = st.file_uploader("Upload Profile Picture", type=["jpg", "jpeg", "png"])
     if uploaded_file:
-        img = Image.open(uploaded_file)
-        img_path = os.path.join(PROFILE_PICTURE_PATH, f"{email}.jpg")
-        img.save(img_path)
-
-        conn = sqlite3.connect("resume_bot.db")
-        c = conn.cursor()
-        c.execute("UPDATE users SET profile_picture=? WHERE email=?", (img_path, email))
-        conn.commit()
-        conn.close()
-
-        st.session_state.profile_picture = img_path
-        st.success("✅ Profile picture updated!")
-        return img_path
+        try:
+            content_hash = images.save_profile_image(uploaded_file.getvalue())
+        except OSError:
+            st.error("❌ That file is not a readable image.")
+            return None
+        if st.session_state.get("profile_picture") != content_hash:
+            repository.update_profile_picture(email, content_hash)
+            st.session_state.profile_picture = content_hash
+            st.success("✅ Profile picture updated!")
+        return content_hash
     return None
 
 def show_dashboard():
     st.title("📊 Dashboard")
     st.success(f"Welcome, {st.session_state.username}!")
 
-    img_path = os.path.join(PROFILE_PICTURE_PATH, f"{st.session_state.email}.jpg")
-    if os.path.exists(img_path):
-        st.image(img_path, width=150)
+    if st.session_state.get("profile_picture"):
+        st.markdown(images.avatar_html(st.session_state.profile_picture, "dashboard"), unsafe_allow_html=True)
     else:
         st.info("No profile picture uploaded yet.")
 
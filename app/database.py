@@ -1,16 +1,5 @@
-import sqlite3
-
-DB_PATH = "users.db"
+from app.repository import DB_PATH, init_schema
 
 def create_users_table():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT,
-        email TEXT UNIQUE,
-        password TEXT,
-        profile_picture TEXT
-    )''')
-    conn.commit()
-    conn.close()
+    """Brings the unified users table up to date (see app/migrations.py)."""
+    init_schema()
@@ -0,0 +1,42 @@
+# ----------- IMPORTS -----------
+import json                               # Parsing generated test cases
+import re                                 # Stripping markdown fences from LLM output
+from app import chains                    # Registered, instrumented prompt chains
+from app.code_runner import grade         # One sandboxed worker per case, checked here
+from app.compilers import prepare         # Cached builds for compiled languages
+
+# ----------- CONSTANTS -----------
+GRADABLE_LANGUAGES = ["Python", "C", "C++", "Java", "JavaScript"]
+
+
+# ----------- TEST CASES -----------
+def parse_test_cases(text):
+    """Extracts a list of {"input", "expected_output"} dicts from an LLM response."""
+    text = re.sub(r"^```(?:json)?|```$", "", text.strip(), flags=re.MULTILINE).strip()
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end == -1:
+        return []
+    try:
+        items = json.loads(text[start:end + 1])
+    except ValueError:
+        return []
+    return [
+        {"input": str(item.get("input", "")), "expected_output": str(item["expected_output"])}
+        for item in items
+        if isinstance(item, dict) and "expected_output" in item
+    ]
+
+def generate_test_cases(llm, question):
+    """Generates (and caches through the LLM cache) hidden test cases for a coding question."""
+    return parse_test_cases(chains.test_cases(llm, question))
+
+
+# ----------- GRADING -----------
+def grade_submission(language, source, cases, stop_on_failure=False):
+    """Runs source against all cases (building it once) and returns the grading result."""
+    if language == "Python":
+        return grade(cases, stop_on_failure, code=source)
+    argv, runner_limits, failure = prepare(language, source)
+    if failure:
+        return failure
+    return grade(cases, stop_on_failure, argv=argv, **runner_limits)
@@ -0,0 +1,152 @@
+# ----------- IMPORTS -----------
+# Pillow is imported inside the processing functions, so pages that only display
+# existing thumbnails never load it.
+import hashlib                            # Content-addressed file names
+import html                               # Escaping captions
+import io                                 # Decode uploads from memory
+import os                                 # Thumbnail files
+import re                                 # Recognizing stored content hashes
+import tempfile                           # Staging files before publishing them
+import threading                          # Memo of already-imported legacy files
+from app import assets                    # Bundled default avatar and cached remote images
+
+# ----------- CONSTANTS -----------
+# Streamlit serves the static/ folder next to main.py at app/static/ when
+# server.enableStaticServing is on (.streamlit/config.toml); the path is built from
+# this file, not the working directory, so it matches wherever the app is started.
+# app.asgi.StaticCacheMiddleware (server.py) marks ?v= URLs immutable for a year,
+# which is safe because a file name never changes content.
+THUMBNAIL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "avatars")
+THUMBNAIL_URL = "app/static/avatars"
+
+# Display width in CSS px per placement; files are rendered at 2x for HiDPI screens
+VARIANTS = {"sidebar": 100, "profile": 140, "dashboard": 150}
+PIXEL_DENSITY = 2
+WEBP_QUALITY = 82
+JPEG_QUALITY = 85
+CONTENT_HASH = re.compile(r"^[0-9a-f]{64}$")
+# The CDN avatar older sessions still carry; shown from the bundled copy instead
+LEGACY_DEFAULT_AVATAR = "https://cdn-icons-png.flaticon.com/512/3135/3135715.png"
+
+_imported = {}                            # (legacy path, mtime) -> content hash
+_imported_lock = threading.Lock()
+
+
+# ----------- PROCESSING -----------
+def _format():
+    from PIL import features
+    return ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+def thumbnail_path(content_hash, variant, extension):
+    return os.path.join(THUMBNAIL_DIR, f"{content_hash}_{variant}.{extension}")
+
+def existing_thumbnail(content_hash, variant):
+    """Path of the stored thumbnail (WebP, or JPEG where Pillow lacks WebP), or None."""
+    for extension in ("webp", "jpg"):
+        path = thumbnail_path(content_hash, variant, extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+def _publish(image, path, image_format):
+    """Writes path atomically; an existing file is left alone, so repeats are free."""
+    if os.path.exists(path):
+        return
+    fd, staging = tempfile.mkstemp(dir=THUMBNAIL_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            if image_format == "WEBP":
+                image.save(out, "WEBP", quality=WEBP_QUALITY, method=4)
+            else:
+                image.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        os.replace(staging, path)
+    except BaseException:
+        os.unlink(staging)
+        raise
+
+def save_profile_image(data):
+    """Creates every thumbnail variant for an uploaded image and returns its content hash.
+
+    The upload is decoded once: for JPEGs Image.draft lets the decoder scale down
+    by up to 8x while decoding, and thumbnail() reduces the rest. Uploads whose
+    thumbnails already exist (reruns, re-uploads) are not decoded at all.
+    Raises OSError for anything Pillow can't (or won't) decode, including
+    decompression bombs.
+    """
+    from PIL import Image, ImageOps
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    if all(existing_thumbnail(content_hash, variant) for variant in VARIANTS):
+        return content_hash
+
+    image_format, extension = _format()
+    paths = {variant: thumbnail_path(content_hash, variant, extension) for variant in VARIANTS}
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    largest = max(VARIANTS.values()) * PIXEL_DENSITY
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            source.draft("RGB", (largest, largest))  # No-op for PNG
+            image = ImageOps.exif_transpose(source)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    except Image.DecompressionBombError as e:  # Not an OSError; callers only handle those
+        raise OSError(f"Image has too many pixels: {e}") from e
+    # Largest first, each variant scaled from the previous one instead of the original
+    for variant, width in sorted(VARIANTS.items(), key=lambda item: -item[1]):
+        size = width * PIXEL_DENSITY
+        image.thumbnail((size, size), Image.LANCZOS, reducing_gap=2.0)
+        _publish(image, paths[variant], image_format)
+    return content_hash
+
+def import_legacy_file(path):
+    """Turns an old full-size ./profile_pictures file into thumbnails, once per file version."""
+    key = (path, os.path.getmtime(path))
+    with _imported_lock:
+        if key in _imported:
+            return _imported[key]
+    with open(path, "rb") as f:
+        content_hash = save_profile_image(f.read())
+    with _imported_lock:
+        _imported[key] = content_hash
+    return content_hash
+
+
+# ----------- DISPLAY -----------
+def _content_hash(profile_image):
+    """The content hash behind a stored profile image value, or None for URLs and missing files."""
+    if not profile_image or not isinstance(profile_image, str):
+        return None
+    if CONTENT_HASH.match(profile_image):
+        return profile_image
+    if not profile_image.startswith(("http://", "https://")) and os.path.isfile(profile_image):
+        try:
+            return import_legacy_file(profile_image)
+        except OSError:
+            return None
+    return None
+
+def avatar_url(profile_image, variant, default=None):
+    """A browser-cacheable URL for profile_image at the given placement.
+
+    profile_image is a content hash from save_profile_image, a legacy file path,
+    or a remote URL (served from the local asset cache); anything else gives
+    default, the bundled avatar unless given.
+    """
+    default = default or assets.default_avatar_url()
+    content_hash = _content_hash(profile_image)
+    if content_hash is None:
+        if isinstance(profile_image, str) and profile_image.startswith(("http://", "https://")) \
+                and profile_image != LEGACY_DEFAULT_AVATAR:
+            return assets.remote_image_url(profile_image, default)
+        return default
+    path = existing_thumbnail(content_hash, variant)
+    if path is None:
+        return default  # Thumbnails removed from disk; the next upload recreates them
+    return f"{THUMBNAIL_URL}/{os.path.basename(path)}?v={content_hash[:12]}"
+
+def avatar_html(profile_image, variant, caption="", default=None):
+    width = VARIANTS[variant]
+    src = avatar_url(profile_image, variant, default)
+    tag = f'<img src="{html.escape(src)}" width="{width}" style="border-radius: 8px;" alt="Profile picture">'
+    if caption:
+        tag += f'<div style="margin-top: 6px;"><strong>{html.escape(caption)}</strong></div>'
+    return tag
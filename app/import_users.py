@@ -0,0 +1,86 @@
+# ----------- IMPORTS -----------
+import argparse                           # Command-line interface
+import hashlib                            # Hashing legacy plaintext passwords
+import re                                 # Detecting already-hashed passwords
+import sqlite3                            # Reading the source database
+from app import repository                # Pooled access to the unified database
+
+# ----------- CONSTANTS -----------
+DEFAULT_BATCH_SIZE = 500
+SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
+# Column names used by the older schemas, mapped onto the unified users table
+COLUMN_ALIASES = {
+    "username": ("username", "name"),
+    "email": ("email",),
+    "phone": ("phone",),
+    "password": ("password",),
+    "profile_picture": ("profile_picture",),
+}
+
+UPSERT_USER = '''INSERT INTO users (username, email, phone, password, profile_picture)
+                 VALUES (?, ?, ?, ?, ?)
+                 ON CONFLICT(email) DO NOTHING'''
+
+
+# ----------- HELPERS -----------
+def _source_columns(conn):
+    available = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+    if "email" not in available:
+        raise ValueError("Source database has no users table with an email column.")
+    columns = {}
+    for target, aliases in COLUMN_ALIASES.items():
+        columns[target] = next((alias for alias in aliases if alias in available), None)
+    return columns
+
+def _normalize_password(password):
+    """utils.py stored plaintext passwords; store them as legacy SHA-256 so the
+    import stays fast. app/credentials.py upgrades them to scrypt on next login."""
+    if password is None or SHA256_HEX.match(password):
+        return password
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+# ----------- IMPORT -----------
+def import_users(source_path, batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """Streams users from a legacy database into the unified one in batched transactions.
+
+    Rows are read with fetchmany so memory stays flat, and each batch is committed
+    separately so the live app is never locked out for more than one batch.
+    Existing emails are left untouched. Returns (rows_read, rows_inserted).
+    """
+    repository.init_schema()
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    try:
+        columns = _source_columns(source)
+        select = ", ".join(columns[name] or "NULL" for name in COLUMN_ALIASES)
+        cursor = source.execute(f"SELECT {select} FROM users")
+        read = inserted = 0
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batch = [(u, e, ph, _normalize_password(pw), pic) for u, e, ph, pw, pic in rows if e]
+            with repository.connection() as conn:
+                before = conn.total_changes
+                conn.executemany(UPSERT_USER, batch)
+                inserted += conn.total_changes - before
+            read += len(rows)
+            if progress:
+                progress(read, inserted)
+        return read, inserted
+    finally:
+        source.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import users from a legacy database into the unified schema.")
+    parser.add_argument("sources", nargs="+", help="Legacy database files, e.g. users.db")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    for path in args.sources:
+        read, inserted = import_users(
+            path, args.batch_size,
+            progress=lambda r, i: print(f"\r{path}: {r} read, {i} imported", end="", flush=True),
+        )
+        print(f"\r{path}: {read} read, {inserted} imported, {read - inserted} skipped")
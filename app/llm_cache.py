@@ -0,0 +1,172 @@
+# ----------- IMPORTS -----------
+import asyncio                            # Async variant for concurrent pipelines
+import hashlib                            # Cache key hashing
+import json                               # Stable serialization of the key parts
+import re                                 # Whitespace normalization of inputs
+import threading                          # Guards the counters and one-time setup
+import time                               # TTL bookkeeping
+from langchain.chains import LLMChain     # LangChain workflow
+from app.repository import connection     # Pooled SQLite connections
+
+# ----------- CONSTANTS -----------
+LLM_CACHE_DB = "llm_cache.db"             # Lives next to resume_bot.db
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60    # Responses older than a week are regenerated
+MAX_ENTRIES = 5000                        # Least recently used rows beyond this are evicted
+# Prompt inputs that are prose, where whitespace is cosmetic. Everything else (the
+# candidate's code above all: indentation is syntax) is keyed byte-for-byte.
+PROSE_INPUTS = {"resume_text", "answer", "question", "skills"}
+
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_lock = threading.Lock()
+_table_ready = False
+
+
+# ----------- DATABASE SETUP -----------
+def _connect():
+    """Borrows a pooled connection to the cache database, creating the table on first use."""
+    global _table_ready
+    if not _table_ready:
+        with _lock, connection(LLM_CACHE_DB) as conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS llm_cache (
+                                key TEXT PRIMARY KEY,
+                                model TEXT,
+                                response TEXT,
+                                created_at REAL,
+                                last_access REAL)''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+            _table_ready = True
+    return connection(LLM_CACHE_DB)
+
+
+# ----------- KEYING -----------
+def normalize_input(value):
+    """Collapses whitespace so cosmetic differences don't defeat the cache."""
+    return re.sub(r"\s+", " ", str(value)).strip()
+
+def model_name(llm):
+    return getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__
+
+def cache_key(model, template, inputs, chain_key=None):
+    """Builds the key from (model name, chain "name@vN", prompt template, inputs).
+
+    Only PROSE_INPUTS are normalized. The chain key means bumping a chain's version
+    retires its cached responses even when the template text is unchanged.
+    """
+    payload = json.dumps(
+        [model, chain_key, template, {k: normalize_input(v) if k in PROSE_INPUTS else str(v)
+                           for k, v in sorted(inputs.items())}],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ----------- STORE -----------
+def get_cached(key, ttl=DEFAULT_TTL_SECONDS):
+    """Returns the cached response for key, or None when missing or expired."""
+    now = time.time()
+    with _connect() as conn:
+        row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+        if ttl is not None and now - row[1] > ttl:
+            conn.execute("DELETE FROM llm_cache WHERE key=?", (key,))
+            return None
+        conn.execute("UPDATE llm_cache SET last_access=? WHERE key=?", (now, key))
+        return row[0]
+
+def put_cached(key, model, response, max_entries=MAX_ENTRIES):
+    """Stores a response and trims the table back down to max_entries."""
+    now = time.time()
+    with _connect() as conn:
+        conn.execute("INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_access) "
+                     "VALUES (?, ?, ?, ?, ?)", (key, model, response, now, now))
+        evicted = conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (max_entries,),
+        ).rowcount
+    if evicted > 0:
+        with _lock:
+            _stats["evictions"] += evicted
+
+def _record(hit):
+    with _lock:
+        _stats["hits" if hit else "misses"] += 1
+
+
+# ----------- PUBLIC API -----------
+def run_chain(llm, prompt, ttl=DEFAULT_TTL_SECONDS, chain_key=None, **inputs):
+    """Runs prompt through llm, serving repeated (model, chain, template, inputs) calls from the cache."""
+    model = model_name(llm)
+    key = cache_key(model, prompt.template, inputs, chain_key)
+    cached = get_cached(key, ttl)
+    if cached is not None:
+        _record(True)
+        return cached
+
+    _record(False)
+    response = LLMChain(llm=llm, prompt=prompt).run(**inputs)
+    put_cached(key, model, response)
+    return response
+
+async def arun_chain(llm, prompt, ttl=DEFAULT_TTL_SECONDS, chain_key=None, **inputs):
+    """Async counterpart of run_chain using the model's ainvoke path."""
+    model = model_name(llm)
+    key = cache_key(model, prompt.template, inputs, chain_key)
+    cached = await asyncio.to_thread(get_cached, key, ttl)
+    if cached is not None:
+        _record(True)
+        return cached
+
+    _record(False)
+    message = await (prompt | llm).ainvoke(inputs)
+    response = getattr(message, "content", message)
+    await asyncio.to_thread(put_cached, key, model, response)
+    return response
+
+def stream_chain(llm, prompt, ttl=DEFAULT_TTL_SECONDS, chain_key=None, **inputs):
+    """Yields response text chunks as the model produces them; a cache hit yields one chunk."""
+    model = model_name(llm)
+    key = cache_key(model, prompt.template, inputs, chain_key)
+    cached = get_cached(key, ttl)
+    if cached is not None:
+        _record(True)
+        yield cached
+        return
+
+    _record(False)
+    parts = []
+    for chunk in (prompt | llm).stream(inputs):
+        text = getattr(chunk, "content", chunk)
+        if text:
+            parts.append(text)
+            yield text
+    put_cached(key, model, "".join(parts))
+
+async def astream_chain(llm, prompt, ttl=DEFAULT_TTL_SECONDS, chain_key=None, **inputs):
+    """Async counterpart of stream_chain using the model's astream path."""
+    model = model_name(llm)
+    key = cache_key(model, prompt.template, inputs, chain_key)
+    cached = await asyncio.to_thread(get_cached, key, ttl)
+    if cached is not None:
+        _record(True)
+        yield cached
+        return
+
+    _record(False)
+    parts = []
+    async for chunk in (prompt | llm).astream(inputs):
+        text = getattr(chunk, "content", chunk)
+        if text:
+            parts.append(text)
+            yield text
+    await asyncio.to_thread(put_cached, key, model, "".join(parts))
+
+def cache_stats():
+    """Returns the hit/miss/eviction counters for this process."""
+    with _lock:
+        return dict(_stats)
+
+def clear_llm_cache():
+    with _connect() as conn:
+        conn.execute("DELETE FROM llm_cache")
@@ -1,115 +1,61 @@
 # ----------- IMPORTS -----------
 # Importing necessary libraries
 import streamlit as st                    # Streamlit for building web apps
-import sqlite3                            # SQLite for database operations
-import hashlib                            # Hashlib for password hashing (security)
 import os                                 # OS module for interacting with the file system
 import random                             # Random module for generating random numbers (e.g., OTPs)
-from PIL import Image                     # PIL (Pillow) for image handling and processing
 import re                                 # Regular expressions for pattern matching (e.g., email/phone validation)
-from streamlit_oauth import OAuth2Component
 from utils import *
+from app import repository                # Pooled SQLite data access
+from app import credentials               # Salted scrypt hashing and session tokens
+from app import rate_limit                # Per-email and per-IP throttling of auth actions
+from app import images                    # Profile picture thumbnails
 import random, time
 
 # ----------- CONSTANTS -----------
-PROFILE_PICTURE_PATH = './profile_pictures/'  # Directory to store profile images
 # ----------- DATABASE SETUP -----------
 def create_users_table():
-    """Creates the users table if it doesn't already exist."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    c.execute('''CREATE TABLE IF NOT EXISTS users (
-                    username TEXT, 
-                    email TEXT PRIMARY KEY,  
-                    phone TEXT, 
-                    password TEXT, 
-                    profile_picture TEXT)''')
-    conn.commit()
-    conn.close()
+    """Creates the users table if it doesn't already exist (once per process)."""
+    repository.init_schema()
 
 def add_user(username, password, email, phone):
-    """Registers a new user with hashed password."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    c.execute("INSERT INTO users (username, password, email, phone, profile_picture) VALUES (?, ?, ?, ?, ?)", 
-              (username, hashed_password, email, phone, None))
-    conn.commit()
-    conn.close()
+    """Registers a new user with a salted scrypt password hash."""
+    repository.add_user(username, credentials.hash_password(password), email, phone)
 
 def validate_user(email, password):
-    """Validates user credentials against stored hashed password."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-    c.execute("SELECT username, email, phone, profile_picture FROM users WHERE email=? AND password=?", 
-              (email, hashed_password))
-    result = c.fetchone()
-    conn.close()
-    return result
+    """Validates user credentials, upgrading legacy password hashes on success."""
+    return credentials.authenticate(email, password)
 
 def email_exists(email):
     """Checks if an email is already registered."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    c.execute("SELECT email FROM users WHERE email=?", (email,))
-    result = c.fetchone()
-    conn.close()
-    return result is not None
+    return repository.email_exists(email)
 
 def update_password(new_password):
     """Updates the password for the logged-in user."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    hashed_password = hashlib.sha256(new_password.encode()).hexdigest()
-    c.execute("UPDATE users SET password=? WHERE email=?", 
-              (hashed_password, st.session_state.email))
-    conn.commit()
-    conn.close()
+    credentials.set_password(st.session_state.email, new_password)
 
 def update_phone(new_phone):
     """Updates the phone number for the logged-in user."""
-    conn = sqlite3.connect("resume_bot.db")
-    c = conn.cursor()
-    c.execute("UPDATE users SET phone=? WHERE email=?", (new_phone, st.session_state.email))
-    conn.commit()
-    conn.close()
+    repository.update_phone(st.session_state.email, new_phone)
     st.session_state.phone = new_phone  # Update session state too
 
 # ----------- PROFILE PICTURE -----------
-if not os.path.exists(PROFILE_PICTURE_PATH):
-    os.makedirs(PROFILE_PICTURE_PATH)  # Ensure directory exists
-
 def upload_profile_picture(email):
-    """Handles uploading and saving profile pictures."""
-    uploaded_file = st.file_uploader("Upload Profile Picture", type=["jpg", "jpeg", "png"])
-    if uploaded_file is not None:
-        img = Image.open(uploaded_file)
-        img_path = os.path.join(PROFILE_PICTURE_PATH, f"{email}.jpg")
-        img.save(img_path)
-
-        # Save the image path in the database
-        conn = sqlite3.connect("resume_bot.db")
-        c = conn.cursor()
-        c.execute("UPDATE users SET profile_picture=? WHERE email=?", (img_path, email))
-        conn.commit()
-        conn.close()
-
-        # Also update session state
-        st.session_state.profile_picture = img_path
-
-        st.success("✅ Profile picture uploaded and saved!")
-        return img_path
-    return None
-
-    """Handles uploading and saving profile pictures."""
+    """Handles uploading profile pictures as pre-sized, content-addressed thumbnails."""
     uploaded_file = st.file_uploader("Upload Profile Picture", type=["jpg", "jpeg", "png"])
     if uploaded_file is not None:
-        img = Image.open(uploaded_file)
-        img_path = os.path.join(PROFILE_PICTURE_PATH, f"{email}.jpg")
-        img.save(img_path)
-        st.success("Profile picture uploaded!")
-        return img_path
+        try:
+            content_hash = images.save_profile_image(uploaded_file.getvalue())  # Idempotent across reruns
+        except OSError:
+            st.error("❌ That file is not a readable image.")
+            return None
+        if st.session_state.get("profile_picture") != content_hash:
+            # Save the image reference in the database
+            repository.update_profile_picture(email, content_hash)
+
+            # Also update session state
+            st.session_state.profile_picture = content_hash
+            st.success("✅ Profile picture uploaded and saved!")
+        return content_hash
     return None
 
 # ----------- UI PAGES -----------
@@ -130,9 +76,9 @@ def show_dashboard():
     st.success(f"Welcome, {st.session_state.username}!")
 
     # Display profile picture
-    img_path = os.path.join(PROFILE_PICTURE_PATH, f"{st.session_state.email}.jpg")
-    if os.path.exists(img_path):
-        st.image(img_path, width=150, caption="Profile Picture")
+    if st.session_state.get("profile_picture"):
+        st.markdown(images.avatar_html(st.session_state.profile_picture, "dashboard", caption="Profile Picture"),
+                    unsafe_allow_html=True)
     else:
         st.info("No profile picture uploaded yet.")
 
@@ -226,6 +172,7 @@ def login():
     """, unsafe_allow_html=True)
 
     st.markdown('<div class="login-title">🔐 ResumeBot - AI Login System</div>', unsafe_allow_html=True)
+    client_ip = rate_limit.client_ip(st.context)  # Rate limits apply per email and per address
     tab1, tab2 = st.tabs(["🔓 Login", "📝 Register"])
 
     with tab1:
@@ -235,13 +182,20 @@ def login():
             submitted = st.form_submit_button("Login")
 
             if submitted:
-                result = validate_user(email, password)
-                if result:
+                # Throttled before any DB or KDF work
+                wait = rate_limit.hit("login", email=email, ip=client_ip)
+                result = None if wait else validate_user(email, password)
+                if wait:
+                    st.error(rate_limit.wait_message(wait))
+                elif result:
                     st.session_state.logged_in = True
                     st.session_state.username = result[0]
                     st.session_state.email = result[1]
                     st.session_state.phone = result[2]
                     st.session_state.profile_picture = result[3]
+                    if result[3]:
+                        st.session_state.profile_image = result[3]  # Stored thumbnail hash (or legacy path)
+                    credentials.bind_login(st.session_state.login_id, result[1])
                     st.success("✅ Login successful!")
                     st.rerun()
                 else:
@@ -272,6 +226,9 @@ def login():
                     st.warning("⚠️ Passwords do not match.")
                 elif not all([username.strip(), password1.strip(), email.strip(), local_phone.strip()]):
                     st.warning("⚠️ All fields are required.")
+                elif wait := (rate_limit.hit("register", ip=client_ip)
+                              or rate_limit.hit("send_otp", email=email, ip=client_ip)):
+                    st.error(rate_limit.wait_message(wait))
                 elif email_exists(email):
                     st.error("❌ Email already exists.")
                 else:
@@ -283,7 +240,10 @@ def login():
         if "generated_otp" in st.session_state:
             user_otp = st.text_input("📨 Enter OTP sent to your email (Simulated)")
             if st.button("Verify & Register"):
-                if user_otp == st.session_state.generated_otp:
+                pending_email = st.session_state.temp_user[2]
+                if wait := rate_limit.hit("verify_otp", email=pending_email, ip=client_ip):
+                    st.error(rate_limit.wait_message(wait))
+                elif user_otp == st.session_state.generated_otp:
                     u, p, e, ph = st.session_state.temp_user
                     add_user(u, p, e, ph)
                     st.success("✅ Registered! Please login.")
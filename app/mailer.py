@@ -0,0 +1,270 @@
+# ----------- IMPORTS -----------
+import argparse                           # Smoke test command-line interface
+import itertools                          # Message ids
+import os                                 # SMTP configuration from .env
+import queue                              # Outgoing mail queue
+import random                             # Retry jitter
+import smtplib                            # SMTP client
+import threading                          # Background senders
+import time                               # Keepalive and backoff
+from collections import OrderedDict       # Bounded delivery status table
+from email.message import EmailMessage    # Message construction
+from dotenv import load_dotenv            # Load SMTP credentials
+
+load_dotenv()
+
+# ----------- CONSTANTS -----------
+SMTP_CONFIG = {
+    "host": os.getenv("SMTP_SERVER", "smtp.gmail.com"),
+    "port": int(os.getenv("SMTP_PORT", "587")),
+    "security": os.getenv("SMTP_SECURITY", "starttls"),   # "starttls", "ssl" or "none"
+    "username": os.getenv("EMAIL_SENDER"),
+    "password": os.getenv("EMAIL_PASSWORD"),
+    "sender": os.getenv("EMAIL_SENDER"),
+    "timeout": 15,
+}
+SENDER_THREADS = int(os.getenv("SMTP_CONNECTIONS", "2"))  # Persistent authenticated connections
+MAX_QUEUED = 1000                         # Sends are refused beyond this many waiting messages
+BATCH_SIZE = 20                           # Messages sent back-to-back on one connection
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 1.0                # Doubles after each failed attempt
+KEEPALIVE_SECONDS = 30                    # NOOP an idle connection this often
+IDLE_CLOSE_SECONDS = 120                  # Close connections unused for this long
+MAX_TRACKED_STATUSES = 10000
+
+_queue = queue.Queue(maxsize=MAX_QUEUED)
+_statuses = OrderedDict()                 # message id -> {"status", "attempts", "error"}
+_status_lock = threading.Lock()
+_ids = itertools.count(1)
+_started = False
+_start_lock = threading.Lock()
+
+
+# ----------- CONFIGURATION -----------
+def configure(**settings):
+    """Overrides SMTP settings, e.g. configure(host="localhost", port=8025, security="none")
+    to point the dispatcher at a local aiosmtpd stand-in."""
+    SMTP_CONFIG.update(settings)
+
+
+# ----------- STATUS -----------
+def _set_status(message_id, status, **details):
+    with _status_lock:
+        entry = _statuses.setdefault(message_id, {"attempts": 0, "error": ""})
+        entry.update(status=status, **details)
+        _statuses.move_to_end(message_id)
+        while len(_statuses) > MAX_TRACKED_STATUSES:
+            _statuses.popitem(last=False)
+
+def delivery_status(message_id):
+    """Returns {"status": "queued"|"sending"|"retrying"|"sent"|"failed", "attempts", "error"}."""
+    with _status_lock:
+        entry = _statuses.get(message_id)
+        return dict(entry) if entry else {"status": "unknown", "attempts": 0, "error": ""}
+
+
+# ----------- CONNECTIONS -----------
+def _is_dropped(error):
+    # SMTPException subclasses OSError; only a disconnect or a socket error means the link failed
+    return isinstance(error, smtplib.SMTPServerDisconnected) or not isinstance(error, smtplib.SMTPException)
+
+class _Connection:
+    """A lazily opened, authenticated SMTP session that reconnects when dropped."""
+
+    def __init__(self):
+        self.smtp = None
+        self.last_used = 0.0
+
+    def _open(self):
+        config = SMTP_CONFIG
+        if config["security"] == "ssl":
+            smtp = smtplib.SMTP_SSL(config["host"], config["port"], timeout=config["timeout"])
+        else:
+            smtp = smtplib.SMTP(config["host"], config["port"], timeout=config["timeout"])
+            if config["security"] == "starttls":
+                smtp.starttls()
+        if config["username"]:
+            smtp.login(config["username"], config["password"])
+        self.smtp = smtp
+
+    def ensure_open(self):
+        if self.smtp is not None and time.monotonic() - self.last_used > KEEPALIVE_SECONDS:
+            try:
+                if self.smtp.noop()[0] != 250:
+                    self.close()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+        if self.smtp is None:
+            self._open()
+
+    def send(self, message):
+        self.ensure_open()
+        try:
+            self.smtp.send_message(message)
+        except OSError as e:
+            if not _is_dropped(e):
+                raise  # The server answered; the reply decides whether to retry
+            self.close()  # Stale connection: reconnect once and retry right away
+            self._open()
+            self.smtp.send_message(message)
+        self.last_used = time.monotonic()
+
+    def close(self):
+        if self.smtp is not None:
+            try:
+                self.smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+        self.smtp = None
+
+
+# ----------- DISPATCH -----------
+def _build_message(job):
+    message = EmailMessage()
+    message["Subject"] = job["subject"]
+    message["From"] = SMTP_CONFIG["sender"]
+    message["To"] = job["to"]
+    message.set_content(job["body"])
+    return message
+
+def _is_transient(error):
+    """True for errors worth retrying: 4xx replies and dropped or refused connections.
+
+    5xx replies (bad address, rejected sender, failed login) fail the same way every time.
+    """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return bool(codes) and all(400 <= code < 500 for code in codes)
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return _is_dropped(error)
+
+def _retry_later(job, error):
+    job["attempts"] += 1
+    if job["attempts"] >= MAX_ATTEMPTS:
+        _set_status(job["id"], "failed", attempts=job["attempts"], error=error)
+        return
+    delay = BACKOFF_BASE_SECONDS * 2 ** (job["attempts"] - 1) * random.uniform(0.8, 1.2)
+    _set_status(job["id"], "retrying", attempts=job["attempts"], error=error)
+    timer = threading.Timer(delay, _queue.put, args=(job,))
+    timer.daemon = True
+    timer.start()
+
+def _sender_loop():
+    connection = _Connection()
+    while True:
+        try:
+            job = _queue.get(timeout=KEEPALIVE_SECONDS)
+        except queue.Empty:
+            if connection.smtp is not None and time.monotonic() - connection.last_used > IDLE_CLOSE_SECONDS:
+                connection.close()
+            continue
+
+        # Drain whatever else is already waiting so the batch shares one session
+        batch = [job]
+        while len(batch) < BATCH_SIZE:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        for job in batch:
+            _set_status(job["id"], "sending", attempts=job["attempts"])
+            try:
+                connection.send(_build_message(job))
+                _set_status(job["id"], "sent", attempts=job["attempts"] + 1, error="")
+            except (smtplib.SMTPException, OSError) as e:
+                if _is_transient(e):
+                    connection.close()
+                    _retry_later(job, str(e))
+                else:
+                    # The session itself is fine after a rejected message; keep using it
+                    _set_status(job["id"], "failed", attempts=job["attempts"] + 1, error=str(e))
+
+def _ensure_started():
+    global _started
+    with _start_lock:
+        if not _started:
+            for i in range(SENDER_THREADS):
+                threading.Thread(target=_sender_loop, name=f"smtp-sender-{i}", daemon=True).start()
+            _started = True
+
+def send_email(to, subject, body):
+    """Queues an email and returns its message id immediately, or None if the queue is full."""
+    _ensure_started()
+    message_id = next(_ids)
+    _set_status(message_id, "queued")
+    try:
+        _queue.put_nowait({"id": message_id, "to": to, "subject": subject, "body": body, "attempts": 0})
+    except queue.Full:
+        _set_status(message_id, "failed", error="Mail queue is full.")
+        return None
+    return message_id
+
+def send_otp(to, otp, expiry_minutes=5):
+    return send_email(to, "Your OTP Verification Code",
+                      f"Your OTP is: {otp}\nThis OTP expires in {expiry_minutes} minutes.")
+
+
+# ----------- SMOKE TEST -----------
+def smoke_test(port=8025, timeout=10.0):
+    """Runs the dispatcher against a local aiosmtpd server (pip install aiosmtpd).
+
+    The server accepts ok@example.com, permanently rejects bad@example.com (550) and
+    defers retry@example.com once (451). Returns {address: final delivery status}.
+    """
+    from aiosmtpd.controller import Controller  # Dev-only dependency
+
+    deferred = set()
+
+    class Handler:
+        async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+            if address == "bad@example.com":
+                return "550 5.1.1 No such user"
+            if address == "retry@example.com" and address not in deferred:
+                deferred.add(address)
+                return "451 4.3.0 Try again later"
+            envelope.rcpt_tos.append(address)
+            return "250 OK"
+
+        async def handle_DATA(self, server, session, envelope):
+            return "250 Message accepted"
+
+    global BACKOFF_BASE_SECONDS
+    controller = Controller(Handler(), hostname="127.0.0.1", port=port)
+    controller.start()
+    saved = dict(SMTP_CONFIG), BACKOFF_BASE_SECONDS
+    configure(host="127.0.0.1", port=port, security="none", username=None, password=None,
+              sender="resumebot@example.com")
+    BACKOFF_BASE_SECONDS = 0.1
+    try:
+        ids = {to: send_email(to, "Smoke test", "Hello from the mail dispatcher.")
+               for to in ("ok@example.com", "bad@example.com", "retry@example.com")}
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            results = {to: delivery_status(message_id) for to, message_id in ids.items()}
+            if all(r["status"] in ("sent", "failed") for r in results.values()):
+                break
+            time.sleep(0.05)
+        return results
+    finally:
+        SMTP_CONFIG.update(saved[0])
+        BACKOFF_BASE_SECONDS = saved[1]
+        controller.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Background SMTP dispatcher.")
+    parser.add_argument("--smoke-test", action="store_true", help="Send through a local aiosmtpd server")
+    parser.add_argument("--port", type=int, default=8025, help="Port for the local server")
+    args = parser.parse_args()
+    if args.smoke_test:
+        expected = {"ok@example.com": ("sent", 1), "bad@example.com": ("failed", 1),
+                    "retry@example.com": ("sent", 2)}
+        results = smoke_test(port=args.port)
+        for to, result in results.items():
+            ok = (result["status"], result["attempts"]) == expected[to]
+            print(f"{'ok  ' if ok else 'FAIL'} {to:<20} {result['status']:<8} attempts={result['attempts']} {result['error']}")
+        raise SystemExit(0 if all((r["status"], r["attempts"]) == expected[to] for to, r in results.items()) else 1)
+    else:
+        parser.print_help()
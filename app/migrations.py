@@ -0,0 +1,113 @@
+# ----------- IMPORTS -----------
+import sqlite3                            # SQLite database access
+
+# ----------- MIGRATIONS -----------
+# Ordered (version, description, statements). The applied version is tracked in
+# PRAGMA user_version, so every migration runs exactly once per database, inside
+# its own transaction. Append new migrations; never edit ones that have shipped.
+MIGRATIONS = [
+    (1, "Legacy users table written by app/login.py", [
+        '''CREATE TABLE IF NOT EXISTS users (
+               username TEXT,
+               email TEXT PRIMARY KEY,
+               phone TEXT,
+               password TEXT,
+               profile_picture TEXT)''',
+    ]),
+    (2, "Unified users table with surrogate id, email lookup and covering login index", [
+        '''CREATE TABLE users_v2 (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               username TEXT,
+               email TEXT NOT NULL,
+               phone TEXT,
+               password TEXT,
+               profile_picture TEXT,
+               created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)''',
+        '''INSERT INTO users_v2 (username, email, phone, password, profile_picture)
+           SELECT username, email, phone, password, profile_picture FROM users''',
+        "DROP TABLE users",
+        "ALTER TABLE users_v2 RENAME TO users",
+        "CREATE UNIQUE INDEX idx_users_email ON users (email)",
+        # Lets the login query be answered from the index alone, without touching the table
+        "CREATE INDEX idx_users_login ON users (email, password, username, phone, profile_picture)",
+    ]),
+    (3, "Server-side session fields keyed by session token", [
+        '''CREATE TABLE session_fields (
+               token TEXT NOT NULL,
+               field TEXT NOT NULL,
+               value TEXT,
+               updated_at REAL NOT NULL,
+               PRIMARY KEY (token, field)) WITHOUT ROWID''',
+        "CREATE INDEX idx_session_fields_updated ON session_fields (updated_at)",
+    ]),
+    (4, "Persistent resume upload history, one row per user and file content", [
+        '''CREATE TABLE uploads (
+               id INTEGER PRIMARY KEY AUTOINCREMENT,
+               user_email TEXT NOT NULL,
+               filename TEXT NOT NULL,
+               content_sha256 TEXT NOT NULL,
+               uploaded_at TEXT NOT NULL)''',
+        "CREATE UNIQUE INDEX idx_uploads_user_content ON uploads (user_email, content_sha256)",
+        # Serves the keyset-paginated history query (newest first) straight from the index
+        "CREATE INDEX idx_uploads_user_time ON uploads (user_email, uploaded_at, id)",
+    ]),
+    (5, "Pending OTPs shared by every app process", [
+        '''CREATE TABLE otp_codes (
+               email TEXT PRIMARY KEY,
+               otp_hash TEXT NOT NULL,
+               created_at REAL NOT NULL,
+               attempts INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID''',
+        "CREATE INDEX idx_otp_codes_created ON otp_codes (created_at)",
+    ]),
+    (6, "Token buckets for rate-limited auth actions", [
+        '''CREATE TABLE rate_limits (
+               key TEXT PRIMARY KEY,
+               tokens REAL NOT NULL,
+               updated_at REAL NOT NULL) WITHOUT ROWID''',
+        "CREATE INDEX idx_rate_limits_updated ON rate_limits (updated_at)",
+    ]),
+    (7, "Login session tokens shared by every app process", [
+        '''CREATE TABLE auth_tokens (
+               token_hash TEXT PRIMARY KEY,
+               email TEXT NOT NULL,
+               expires_at REAL NOT NULL) WITHOUT ROWID''',
+        "CREATE INDEX idx_auth_tokens_expires ON auth_tokens (expires_at)",
+    ]),
+    # Rows were keyed by raw session ids (and held raw login tokens); now by SHA-256 only.
+    # The old rows can't be converted usefully, so those sessions simply log in again.
+    (8, "Session and login rows keyed by a hash of the session id", [
+        "DELETE FROM session_fields",
+        "DELETE FROM auth_tokens",
+    ]),
+]
+
+
+# ----------- ENGINE -----------
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def latest_version():
+    return MIGRATIONS[-1][0]
+
+def migrate(conn, target=None):
+    """Applies every pending migration up to target (default: latest) and returns the new version."""
+    target = latest_version() if target is None else target
+    version = current_version(conn)
+    for number, description, statements in MIGRATIONS:
+        if number <= version or number > target:
+            continue
+        try:
+            conn.execute("BEGIN IMMEDIATE")  # Takes the write lock so concurrent starters serialize
+            if current_version(conn) >= number:  # Another process got here first
+                conn.rollback()
+                version = current_version(conn)
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        version = number
+    return version
@@ -0,0 +1,146 @@
+# ----------- IMPORTS -----------
+import hashlib                            # OTPs are stored hashed
+import hmac                               # Constant-time comparison
+import os                                 # Backend selection
+import threading                          # Guards the in-process backend
+import time                               # Expiry
+from collections import OrderedDict       # Insertion order doubles as expiry order
+from app import repository                # Pooled SQLite connections
+
+# ----------- CONSTANTS -----------
+OTP_BACKEND = os.getenv("OTP_BACKEND", "sqlite")   # "sqlite" (shared by replicas) or "memory"
+OTP_RETENTION = int(os.getenv("OTP_RETENTION_SECONDS", "900"))  # Unverified OTPs are dropped after this
+MAX_MEMORY_OTPS = 50000                   # Oldest OTPs beyond this are evicted
+MAX_SQLITE_OTPS = 200000
+PURGE_EVERY_STORES = 200                  # How often the SQLite backend trims expired and excess rows
+
+UPSERT_OTP = ("INSERT INTO otp_codes (email, otp_hash, created_at, attempts) VALUES (?, ?, ?, 0) "
+              "ON CONFLICT(email) DO UPDATE SET otp_hash=excluded.otp_hash, "
+              "created_at=excluded.created_at, attempts=0")
+SELECT_OTP = "SELECT created_at, otp_hash, attempts FROM otp_codes WHERE email=? AND created_at > ?"
+UPDATE_ATTEMPTS = "UPDATE otp_codes SET attempts=? WHERE email=?"
+DELETE_OTP = "DELETE FROM otp_codes WHERE email=?"
+DELETE_EXPIRED_OTPS = "DELETE FROM otp_codes WHERE created_at < ?"
+# Keeps only the newest MAX_SQLITE_OTPS rows, walking idx_otp_codes_created
+DELETE_EXCESS_OTPS = ("DELETE FROM otp_codes WHERE created_at < "
+                      "(SELECT created_at FROM otp_codes ORDER BY created_at DESC LIMIT 1 OFFSET ?)")
+
+
+# ----------- RULES -----------
+def hash_otp(email, otp):
+    return hashlib.sha256(f"{email}:{otp}".encode()).hexdigest()
+
+def _decide(record, otp_hash, now, expiry, max_attempts):
+    """Applies the verification rules to (created_at, otp_hash, attempts).
+
+    Returns (valid, message, attempts); attempts is None when the OTP must be deleted.
+    """
+    created_at, stored_hash, attempts = record
+    if now - created_at > expiry:
+        return False, "OTP expired.", None
+    if attempts >= max_attempts:
+        return False, "Max attempts reached.", None
+    if hmac.compare_digest(otp_hash, stored_hash):
+        return True, "OTP verified.", None
+    attempts += 1
+    return False, f"Invalid OTP. Attempts left: {max_attempts - attempts}", attempts
+
+
+# ----------- BACKENDS -----------
+class MemoryOTPBackend:
+    """Per-process {email: (created_at, otp_hash, attempts)}.
+
+    Every OTP lives for the same retention period and re-sending moves it to the
+    end, so insertion order is expiry order: expired entries are popped from the
+    front in O(1) each, and the size cap evicts from the same end.
+    """
+
+    def __init__(self, max_entries=MAX_MEMORY_OTPS, retention=OTP_RETENTION):
+        self.max_entries, self.retention = max_entries, retention
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        entries = self._entries
+        while entries and next(iter(entries.values()))[0] + self.retention < now:
+            entries.popitem(last=False)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def store(self, email, otp_hash):
+        now = time.time()
+        with self._lock:
+            self._entries.pop(email, None)
+            self._entries[email] = (now, otp_hash, 0)
+            self._purge(now)
+
+    def verify(self, email, otp_hash, expiry, max_attempts):
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            record = self._entries.get(email)
+            if record is None:
+                return False, "No OTP found. Please resend."
+            valid, message, attempts = _decide(record, otp_hash, now, expiry, max_attempts)
+            if attempts is None:
+                del self._entries[email]
+            else:
+                self._entries[email] = (record[0], record[1], attempts)  # Keeps its expiry position
+            return valid, message
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteOTPBackend:
+    """One row per email in the main database, so any replica can verify an OTP."""
+
+    def __init__(self, retention=OTP_RETENTION, max_entries=MAX_SQLITE_OTPS):
+        self.retention, self.max_entries = retention, max_entries
+        self._stores = 0
+        repository.init_schema()
+
+    def store(self, email, otp_hash):
+        now = time.time()
+        with repository.connection() as conn:
+            conn.execute(UPSERT_OTP, (email, otp_hash, now))
+            self._stores += 1
+            if self._stores % PURGE_EVERY_STORES == 0:
+                conn.execute(DELETE_EXPIRED_OTPS, (now - self.retention,))
+                conn.execute(DELETE_EXCESS_OTPS, (self.max_entries - 1,))
+
+    def verify(self, email, otp_hash, expiry, max_attempts):
+        now = time.time()
+        with repository.connection() as conn:
+            # Read and update under the write lock so concurrent guesses are each counted
+            conn.execute("BEGIN IMMEDIATE")
+            record = conn.execute(SELECT_OTP, (email, now - self.retention)).fetchone()
+            if record is None:
+                return False, "No OTP found. Please resend."
+            valid, message, attempts = _decide(record, otp_hash, now, expiry, max_attempts)
+            if attempts is None:
+                conn.execute(DELETE_OTP, (email,))
+            else:
+                conn.execute(UPDATE_ATTEMPTS, (attempts, email))
+            return valid, message
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = MemoryOTPBackend() if OTP_BACKEND == "memory" else SQLiteOTPBackend()
+        return _backend
+
+
+# ----------- API -----------
+def store(email, otp):
+    """Saves a fresh OTP for email, replacing any previous one and resetting its attempts."""
+    get_backend().store(email, hash_otp(email, otp))
+
+def verify(email, otp, expiry_seconds, max_attempts):
+    """Checks otp and returns (valid, message); the OTP is consumed once verified or exhausted."""
+    return get_backend().verify(email, hash_otp(email, otp), expiry_seconds, max_attempts)
@@ -0,0 +1,91 @@
+# ----------- IMPORTS -----------
+import asyncio                            # Concurrent LLM calls
+import queue                              # Hand results back to the Streamlit script thread
+import threading                          # Long-lived event loop thread
+import time                               # Throttle partial-result events
+from app import chains                                # Registered, instrumented prompt chains
+from app import skills as skill_extractor             # Local taxonomy-based skill matching
+from app.streaming import STREAM_FLUSH_INTERVAL      # Shared flush interval for partial output
+
+# ----------- EVENT LOOP -----------
+# Streamlit starts a new script thread on every rerun, so the async Gemini client
+# gets one shared, long-lived loop instead of a fresh asyncio.run() per rerun.
+_loop = None
+_loop_lock = threading.Lock()
+
+def background_loop():
+    """Returns the shared event loop, starting its thread on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-pipeline", daemon=True).start()
+    return _loop
+
+def run_with_events(coro_factory, on_event=None, poll_interval=0.05):
+    """Runs coro_factory(emit) on the shared loop, replaying emitted events on the calling thread.
+
+    Streamlit elements may only be touched from the script thread, so coroutines
+    report progress through emit(name, value) and the caller's on_event renders it.
+    """
+    events = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(
+        coro_factory(lambda name, value: events.put((name, value))), background_loop()
+    )
+    while True:
+        try:
+            name, value = events.get(timeout=poll_interval)
+        except queue.Empty:
+            if future.done() and events.empty():
+                break
+            continue
+        if on_event:
+            on_event(name, value)
+    return future.result()
+
+
+# ----------- RESUME PIPELINE -----------
+async def _generate(llm, contexts, emit):
+    async def interview_questions():
+        # Streamed so the first questions show up before the whole list is generated
+        questions, last_flush = "", 0.0
+        async for chunk in chains.interview_questions_stream(llm, contexts["questions"]):
+            questions += chunk
+            now = time.monotonic()
+            if now - last_flush >= STREAM_FLUSH_INTERVAL:
+                last_flush = now
+                emit("questions_partial", questions)
+        emit("questions", questions)
+        return questions
+
+    async def skills_then_coding():
+        # Matched locally in milliseconds; the LLM only sees resumes the taxonomy can't read
+        local = skill_extractor.extract_skills(contexts["skills"])
+        if local["confident"]:
+            skills = skill_extractor.format_skills(local)
+        else:
+            skills = await chains.extract_skills(llm, contexts["skills"])
+        emit("skills", skills)
+        coding_questions = ""
+        if skills:
+            coding_questions = await chains.coding_questions(llm, skills)
+        emit("coding_questions", coding_questions)
+        return skills, coding_questions
+
+    questions, (skills, coding_questions) = await asyncio.gather(
+        interview_questions(), skills_then_coding()
+    )
+    return {"questions": questions, "skills": skills, "coding_questions": coding_questions}
+
+def generate_interview_material(llm, contexts, on_result=None):
+    """Generates interview questions, skills and coding questions for a resume.
+
+    contexts holds the budgeted resume text for the "questions" and "skills" chains
+    (see resume_sections.prepare_resume). Those two only depend on the resume, so
+    they are issued concurrently; coding questions wait only on the skills.
+    on_result(name, value) is called on the calling thread as each piece completes.
+    """
+    return run_with_events(
+        lambda emit: _generate(llm, contexts, emit),
+        on_event=on_result,
+    )
@@ -1,4 +1,5 @@
 import streamlit as st
+from app import images
 
 def profile():
     st.markdown("## 👤 User Profile")
@@ -7,16 +8,11 @@ def profile():
     col1, col2 = st.columns([1, 3])
 
     with col1:
-        try:
-            st.image(
-                st.session_state.profile_image,
-                width=140,
-                caption=f"**{st.session_state.username}**",
-                output_format="PNG"
-            )
-        except Exception:
-            st.warning("⚠️ Unable to load profile image.")
-            st.image("https://cdn-icons-png.flaticon.com/512/3135/3135715.png", width=140)
+        # Pre-sized thumbnail served from app/static with long-lived cache headers
+        st.markdown(
+            images.avatar_html(st.session_state.profile_image, "profile", caption=st.session_state.username),
+            unsafe_allow_html=True
+        )
 
     with col2:
         st.markdown(
@@ -0,0 +1,147 @@
+# ----------- IMPORTS -----------
+import hashlib                            # Fixed-size bucket keys
+import os                                 # Backend selection
+import threading                          # Guards the in-process backend
+import time                               # Token refill
+from collections import OrderedDict       # LRU ordering for the in-process backend
+from app import repository                # Pooled SQLite connections
+
+# ----------- CONSTANTS -----------
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "sqlite")  # "sqlite" (shared by replicas) or "memory"
+MAX_MEMORY_KEYS = 100000                  # Least recently used buckets beyond this are dropped (i.e. refilled)
+MAX_SQLITE_KEYS = 200000                  # Oldest buckets beyond this are dropped at each purge
+PURGE_EVERY_HITS = 500                    # How often the SQLite backend deletes buckets that are full again
+# Reverse proxies in front of the app that append to X-Forwarded-For. 0 (the default)
+# ignores the header, which any client can set, and uses the socket address.
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", "0"))
+
+# Token buckets per action and identity: (capacity, seconds to refill one token).
+# A bucket allows `capacity` requests in a burst and then one per refill period.
+RULES = {
+    "login":      {"email": (5, 60),  "ip": (20, 6)},
+    "register":   {"ip": (5, 120)},
+    "send_otp":   {"email": (1, 60),  "ip": (5, 60)},   # One email per address per minute
+    "verify_otp": {"email": (5, 60),  "ip": (20, 6)},
+}
+# A bucket idle this long is full again, so its row carries no information
+MAX_REFILL_SECONDS = max(cap * period for rules in RULES.values() for cap, period in rules.values())
+
+SELECT_BUCKETS = "SELECT key, tokens, updated_at FROM rate_limits WHERE key IN ({})"
+UPSERT_BUCKET = ("INSERT INTO rate_limits (key, tokens, updated_at) VALUES (?, ?, ?) "
+                 "ON CONFLICT(key) DO UPDATE SET tokens=excluded.tokens, updated_at=excluded.updated_at")
+DELETE_FULL_BUCKETS = "DELETE FROM rate_limits WHERE updated_at < ?"
+DELETE_OLDEST_BUCKETS = ("DELETE FROM rate_limits WHERE key IN "
+                         "(SELECT key FROM rate_limits ORDER BY updated_at LIMIT "
+                         "max(0, (SELECT COUNT(*) FROM rate_limits) - ?))")
+
+
+# ----------- TOKEN BUCKET -----------
+def _refill(bucket, capacity, period, now):
+    """Returns the tokens available now for a stored (tokens, updated_at), or a new full bucket."""
+    if bucket is None:
+        return float(capacity)
+    tokens, updated_at = bucket
+    return min(capacity, tokens + (now - updated_at) / period)
+
+def _take(buckets, limits, now):
+    """Decides one hit against every bucket; all must have a token for it to pass.
+
+    Returns (wait_seconds, new_buckets); new_buckets is only meaningful when wait is 0.
+    """
+    wait, updated = 0.0, {}
+    for key, (capacity, period) in limits.items():
+        tokens = _refill(buckets.get(key), capacity, period, now)
+        if tokens < 1:
+            wait = max(wait, (1 - tokens) * period)
+        updated[key] = (tokens - 1, now)
+    return wait, updated
+
+
+# ----------- BACKENDS -----------
+class MemoryRateLimitBackend:
+    """Per-process LRU of {key: (tokens, updated_at)}; O(1) per bucket, bounded in size."""
+
+    def __init__(self, max_keys=MAX_MEMORY_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, limits):
+        now = time.time()
+        with self._lock:
+            buckets = {key: self._buckets[key] for key in limits if key in self._buckets}
+            wait, updated = _take(buckets, limits, now)
+            if wait:
+                return wait
+            for key, bucket in updated.items():
+                self._buckets.pop(key, None)
+                self._buckets[key] = bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return 0.0
+
+
+class SQLiteRateLimitBackend:
+    """One row per bucket in the main database, so every replica enforces the same limits."""
+
+    def __init__(self):
+        self._hits = 0
+        repository.init_schema()
+
+    def hit(self, limits):
+        now = time.time()
+        with repository.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")  # Concurrent hits on the same bucket serialize
+            rows = conn.execute(SELECT_BUCKETS.format(", ".join("?" for _ in limits)), list(limits)).fetchall()
+            wait, updated = _take({key: (tokens, at) for key, tokens, at in rows}, limits, now)
+            if wait:
+                return wait
+            conn.executemany(UPSERT_BUCKET, [(key, tokens, at) for key, (tokens, at) in updated.items()])
+            self._hits += 1
+            if self._hits % PURGE_EVERY_HITS == 0:
+                conn.execute(DELETE_FULL_BUCKETS, (now - MAX_REFILL_SECONDS,))
+                conn.execute(DELETE_OLDEST_BUCKETS, (MAX_SQLITE_KEYS,))
+            return 0.0
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = MemoryRateLimitBackend() if RATE_LIMIT_BACKEND == "memory" else SQLiteRateLimitBackend()
+        return _backend
+
+
+# ----------- API -----------
+def hit(action, email=None, ip=None):
+    """Counts one `action` attempt against the email and IP buckets.
+
+    Returns 0 when allowed, otherwise the seconds to wait; a refused attempt uses no tokens.
+    """
+    identities = {"email": (email or "").strip().lower(), "ip": ip}
+    # Identities are client-supplied, so keys are hashed to a fixed size
+    limits = {f"{action}:{kind}:{hashlib.sha256(identities[kind].encode()).hexdigest()[:32]}": rule
+              for kind, rule in RULES[action].items() if identities[kind]}
+    if not limits:
+        return 0.0
+    return get_backend().hit(limits)
+
+def client_ip(context, trusted_proxies=None):
+    """The client address from st.context.
+
+    X-Forwarded-For is read only behind TRUSTED_PROXY_COUNT proxies, taking the
+    right-most hop they didn't add; anything left of it is client-controlled.
+    """
+    trusted_proxies = TRUSTED_PROXY_COUNT if trusted_proxies is None else trusted_proxies
+    if trusted_proxies > 0:
+        forwarded = context.headers.get("X-Forwarded-For", "") if getattr(context, "headers", None) else ""
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        if len(hops) >= trusted_proxies:
+            return hops[-trusted_proxies]
+    return getattr(context, "ip_address", None)
+
+def wait_message(wait):
+    return f"⏳ Too many attempts. Please try again in {int(wait) + 1} seconds."
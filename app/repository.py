@@ -0,0 +1,130 @@
+# ----------- IMPORTS -----------
+import queue                              # Idle connection pool
+import sqlite3                            # SQLite database access
+import threading                          # One-time schema setup
+from contextlib import contextmanager     # Borrow/return connections with `with`
+from app.migrations import migrate        # Versioned schema migrations
+
+# ----------- CONSTANTS -----------
+DB_PATH = "resume_bot.db"                 # Main application database
+POOL_SIZE = 8                             # Idle connections kept open per database file
+
+# SQL is kept as constants so sqlite3's per-connection statement cache reuses the
+# compiled statements across calls instead of re-preparing them.
+INSERT_USER = "INSERT INTO users (username, password, email, phone, profile_picture) VALUES (?, ?, ?, ?, ?)"
+SELECT_USER_FOR_LOGIN = ("SELECT username, email, phone, profile_picture, password FROM users "
+                         "INDEXED BY idx_users_login WHERE email=?")
+SELECT_EMAIL = "SELECT 1 FROM users WHERE email=?"
+UPDATE_PASSWORD = "UPDATE users SET password=? WHERE email=?"
+UPDATE_PHONE = "UPDATE users SET phone=? WHERE email=?"
+UPDATE_PROFILE_PICTURE = "UPDATE users SET profile_picture=? WHERE email=?"
+UPSERT_UPLOAD = ("INSERT INTO uploads (user_email, filename, content_sha256, uploaded_at) VALUES (?, ?, ?, ?) "
+                 "ON CONFLICT(user_email, content_sha256) DO UPDATE SET "
+                 "filename=excluded.filename, uploaded_at=excluded.uploaded_at")
+SELECT_UPLOADS_FIRST_PAGE = ("SELECT id, filename, uploaded_at FROM uploads WHERE user_email=? "
+                             "ORDER BY uploaded_at DESC, id DESC LIMIT ?")
+SELECT_UPLOADS_AFTER = ("SELECT id, filename, uploaded_at FROM uploads WHERE user_email=? "
+                        "AND (uploaded_at, id) < (?, ?) ORDER BY uploaded_at DESC, id DESC LIMIT ?")
+COUNT_UPLOADS = "SELECT COUNT(*) FROM uploads WHERE user_email=?"
+DELETE_UPLOADS = "DELETE FROM uploads WHERE user_email=?"
+
+_pools = {}
+_pools_lock = threading.Lock()
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+# ----------- CONNECTION POOL -----------
+def _open(path):
+    conn = sqlite3.connect(path, timeout=10, check_same_thread=False, cached_statements=128)
+    conn.execute("PRAGMA journal_mode=WAL")       # Readers no longer block the writer
+    conn.execute("PRAGMA synchronous=NORMAL")     # Safe with WAL, far fewer fsyncs
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+def _pool(path):
+    with _pools_lock:
+        return _pools.setdefault(path, queue.LifoQueue(maxsize=POOL_SIZE))
+
+@contextmanager
+def connection(path=DB_PATH):
+    """Borrows a pooled connection, committing on success and rolling back on error."""
+    pool = _pool(path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _open(path)
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+def init_schema():
+    """Applies pending migrations once per process; later calls return immediately."""
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            with connection() as conn:
+                migrate(conn)
+            _schema_ready = True
+
+
+# ----------- USERS -----------
+def add_user(username, password_hash, email, phone):
+    with connection() as conn:
+        conn.execute(INSERT_USER, (username, password_hash, email, phone, None))
+
+def find_user_by_email(email):
+    """Returns (username, email, phone, profile_picture, password_hash) or None."""
+    with connection() as conn:
+        return conn.execute(SELECT_USER_FOR_LOGIN, (email,)).fetchone()
+
+def email_exists(email):
+    with connection() as conn:
+        return conn.execute(SELECT_EMAIL, (email,)).fetchone() is not None
+
+def update_password(email, password_hash):
+    with connection() as conn:
+        conn.execute(UPDATE_PASSWORD, (password_hash, email))
+
+def update_phone(email, phone):
+    with connection() as conn:
+        conn.execute(UPDATE_PHONE, (phone, email))
+
+def update_profile_picture(email, path):
+    with connection() as conn:
+        conn.execute(UPDATE_PROFILE_PICTURE, (path, email))
+
+
+# ----------- UPLOADS -----------
+def record_upload(email, filename, content_sha256, uploaded_at):
+    """Records an upload; re-uploading the same content only moves it to the top."""
+    with connection() as conn:
+        conn.execute(UPSERT_UPLOAD, (email, filename, content_sha256, uploaded_at))
+
+def list_uploads(email, after=None, limit=20):
+    """Returns up to limit (id, filename, uploaded_at) rows, newest first.
+
+    after is the (uploaded_at, id) of the last row of the previous page.
+    """
+    with connection() as conn:
+        if after is None:
+            return conn.execute(SELECT_UPLOADS_FIRST_PAGE, (email, limit)).fetchall()
+        return conn.execute(SELECT_UPLOADS_AFTER, (email, after[0], after[1], limit)).fetchall()
+
+def count_uploads(email):
+    with connection() as conn:
+        return conn.execute(COUNT_UPLOADS, (email,)).fetchone()[0]
+
+def clear_uploads(email):
+    with connection() as conn:
+        conn.execute(DELETE_UPLOADS, (email,))
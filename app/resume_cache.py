@@ -0,0 +1,130 @@
+# ----------- IMPORTS -----------
+import hashlib                            # SHA-256 content hash used as the cache key
+import io                                 # Wrap raw bytes for PdfReader
+import json                               # On-disk spill format
+import os                                 # File system access for the spill directory
+import threading                          # Guard the shared LRU across sessions
+import time                               # Spill expiry
+from collections import OrderedDict       # LRU ordering
+from pypdf import PdfReader               # PDF text extraction
+
+# ----------- CONSTANTS -----------
+# Directory for parsed resumes spilled to disk. They are candidates' personal data,
+# so the spill is bounded in both count and age.
+RESUME_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resume_cache")
+MAX_MEMORY_ENTRIES = 32                   # Parsed resumes kept in memory per process
+MAX_SPILLED_RESUMES = 500                 # Oldest spilled files beyond this are removed
+SPILL_TTL_SECONDS = int(os.getenv("RESUME_CACHE_TTL_SECONDS", str(24 * 60 * 60)))  # Older files are removed
+
+_memory_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+# ----------- HELPERS -----------
+def resume_hash(data):
+    """Returns the SHA-256 hex digest of the raw resume bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+def _spill_path(digest):
+    return os.path.join(RESUME_CACHE_PATH, f"{digest}.json")
+
+def _remember(digest, parsed):
+    """Inserts a parsed resume into the LRU, evicting the oldest entry when full."""
+    with _lock:
+        _memory_cache[digest] = parsed
+        _memory_cache.move_to_end(digest)
+        while len(_memory_cache) > MAX_MEMORY_ENTRIES:
+            _memory_cache.popitem(last=False)
+
+def _load_spilled(digest):
+    path = _spill_path(digest)
+    try:
+        if os.path.getmtime(path) < time.time() - SPILL_TTL_SECONDS:
+            os.remove(path)
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _evict_spilled():
+    """Removes expired spilled resumes, then the oldest ones beyond MAX_SPILLED_RESUMES."""
+    cutoff = time.time() - SPILL_TTL_SECONDS
+    entries = []
+    for name in os.listdir(RESUME_CACHE_PATH):
+        path = os.path.join(RESUME_CACHE_PATH, name)
+        try:
+            mtime = os.path.getmtime(path)
+            if mtime < cutoff:
+                os.remove(path)  # Also sweeps .tmp files left by a crashed writer
+            elif name.endswith(".json"):
+                entries.append((mtime, path))
+        except OSError:
+            pass  # Removed concurrently
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - MAX_SPILLED_RESUMES)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def _spill(digest, parsed):
+    """Writes a parsed resume to disk atomically so other processes can reuse it."""
+    os.makedirs(RESUME_CACHE_PATH, exist_ok=True)
+    tmp_path = f"{_spill_path(digest)}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(parsed, f)
+        os.replace(tmp_path, _spill_path(digest))
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    _evict_spilled()
+
+
+# ----------- PARSING -----------
+def extract_resume(data):
+    """Parses PDF bytes once, returning the text, page count and per-page start offsets."""
+    reader = PdfReader(io.BytesIO(data))
+    parts, offsets, position = [], [], 0
+    for page in reader.pages:
+        offsets.append(position)
+        text = page.extract_text() or ""
+        parts.append(text)
+        position += len(text)
+    return {
+        "text": "".join(parts),
+        "page_count": len(reader.pages),
+        "page_offsets": offsets,
+    }
+
+def parse_resume_bytes(data):
+    """Returns the parsed resume for the given bytes, parsing only on a cache miss."""
+    digest = resume_hash(data)
+
+    with _lock:
+        parsed = _memory_cache.get(digest)
+        if parsed is not None:
+            _memory_cache.move_to_end(digest)
+            return {"sha256": digest, **parsed}
+
+    parsed = _load_spilled(digest)
+    if parsed is None:
+        parsed = extract_resume(data)
+        _spill(digest, parsed)
+    _remember(digest, parsed)
+    return {"sha256": digest, **parsed}
+
+def parse_resume(uploaded_file):
+    """Parses a Streamlit UploadedFile through the content-addressed cache."""
+    return parse_resume_bytes(uploaded_file.getvalue())
+
+def clear_resume_cache(include_disk=False):
+    """Drops all in-memory entries, and optionally the spilled files too."""
+    with _lock:
+        _memory_cache.clear()
+    if include_disk and os.path.isdir(RESUME_CACHE_PATH):
+        for name in os.listdir(RESUME_CACHE_PATH):
+            if name.endswith(".json"):
+                os.remove(os.path.join(RESUME_CACHE_PATH, name))
@@ -0,0 +1,158 @@
+# ----------- IMPORTS -----------
+import re                                 # Whitespace, boilerplate and heading detection
+import threading                          # Guards the savings counters
+from app.chains import estimate_tokens, CHARS_PER_TOKEN  # Shared token estimate
+
+# ----------- CONSTANTS -----------
+# Heading aliases (lowercase, letters and spaces only) for each canonical section
+SECTION_ALIASES = {
+    "summary": ("summary", "profile", "professional summary", "career objective", "objective", "about me"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internship", "internships"),
+    "projects": ("projects", "academic projects", "personal projects", "key projects"),
+    "skills": ("skills", "technical skills", "key skills", "core competencies", "technologies",
+               "tools and technologies", "technical proficiency"),
+    "education": ("education", "academic background", "qualifications", "educational qualification",
+                  "academic qualifications"),
+    "certifications": ("certifications", "certificates", "courses", "training"),
+    "achievements": ("achievements", "awards", "accomplishments", "honors"),
+}
+HEADINGS = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+MAX_HEADING_CHARS = 40
+INLINE_HEADING = re.compile(r"^([A-Za-z &/]{3,40}):\s*(\S.*)$")  # "Skills: Python, SQL"
+
+# Sections (in order) and token budget for each prompt that reads the resume.
+# Text before the first heading (name, contact, summary) is the "header" section.
+PROMPT_CONTEXTS = {
+    "questions": (("header", "summary", "experience", "projects", "skills", "education",
+                   "certifications", "achievements"), 1500),
+    "skills": (("skills", "experience", "projects", "certifications"), 800),
+}
+
+BOILERPLATE = re.compile(
+    r"^(page \d+( of \d+)?|\d{1,2}|-\s*\d+\s*-|curriculum vitae|resume|r[eé]sum[eé]|"
+    r"references? (are )?available (up)?on request\.?|declaration)$",
+    re.IGNORECASE,
+)
+MIN_REPEATED_LINE_CHARS = 20              # Longer lines seen twice are page headers/footers
+
+_totals = {"requests": 0, "raw_tokens": 0, "sent_tokens": 0}
+_lock = threading.Lock()
+
+
+# ----------- PREPROCESSING -----------
+def normalize(text):
+    """Collapses whitespace and drops page numbers, titles and repeated headers/footers."""
+    lines, seen = [], set()
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if not line or BOILERPLATE.match(line):
+            continue
+        if len(line) >= MIN_REPEATED_LINE_CHARS:
+            if line in seen:
+                continue
+            seen.add(line)
+        lines.append(line)
+    return "\n".join(lines)
+
+def heading_of(line):
+    """Returns the canonical section for a heading line, or None."""
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    key = re.sub(r"[^a-z ]+", " ", line.lower())
+    return HEADINGS.get(re.sub(r"\s+", " ", key).strip())
+
+def split_sections(text):
+    """Splits normalized resume text into {section: text}, merging repeated headings."""
+    sections, current = {}, "header"
+    for line in text.splitlines():
+        name = heading_of(line)
+        if name:
+            current = name
+            continue
+        inline = INLINE_HEADING.match(line)
+        if inline and heading_of(inline.group(1)):
+            current, line = heading_of(inline.group(1)), inline.group(2)
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines) for name, lines in sections.items() if lines}
+
+def _cut(line, chars):
+    # At the last word boundary that fits; a single longer word is cut mid-word
+    if len(line) <= chars:
+        return line
+    head = line[:chars]
+    space = head.rfind(" ")
+    return head[:space].rstrip() if space > 0 else head
+
+def fit(text, budget):
+    """Returns the leading lines of text that fit in budget tokens.
+
+    The first line that doesn't fit is cut at a word boundary, so a resume
+    extracted as one long paragraph still yields text for any positive budget.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    kept, used = [], 0
+    for line in text.splitlines():
+        cost = estimate_tokens(line) + (1 if kept else 0)  # The newline joining it to the last one
+        if used + cost > budget:
+            room = (budget - used - (1 if kept else 0)) * CHARS_PER_TOKEN
+            partial = _cut(line, room) if room > 0 else ""
+            if partial:
+                kept.append(partial)
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+def build_context(sections, names, budget):
+    """Concatenates the named sections in order, each trimmed to what is left of the budget."""
+    parts, remaining = [], budget
+    for name in names:
+        if name not in sections or remaining <= 0:
+            continue
+        label = "" if name == "header" else f"{name.title()}:\n"
+        body = fit(sections[name], remaining - estimate_tokens(label))
+        if body:
+            parts.append(label + body)
+            remaining -= estimate_tokens(label + body) + 1
+    return "\n\n".join(parts)
+
+
+# ----------- PUBLIC API -----------
+def prepare_resume(resume_text):
+    """Builds the token-budgeted context for each resume prompt.
+
+    Returns {"contexts": {prompt: text}, "report": {...}}; the report compares the
+    tokens sent against interpolating the raw text into every prompt. When none of
+    a prompt's sections are recognized it gets the normalized text within budget.
+    """
+    normalized = normalize(resume_text)
+    sections = split_sections(normalized)
+    structured = len(sections) > 1
+    contexts = {}
+    for prompt, (names, budget) in PROMPT_CONTEXTS.items():
+        context = build_context(sections, names, budget) if structured else ""
+        contexts[prompt] = context or fit(normalized, budget)
+
+    raw_tokens = estimate_tokens(resume_text) * len(contexts)
+    sent_tokens = sum(estimate_tokens(text) for text in contexts.values())
+    report = {
+        "sections": sorted(sections),
+        "raw_tokens": raw_tokens,
+        "sent_tokens": sent_tokens,
+        "saved_tokens": raw_tokens - sent_tokens,
+        "per_prompt": {prompt: estimate_tokens(text) for prompt, text in contexts.items()},
+    }
+    with _lock:
+        _totals["requests"] += 1
+        _totals["raw_tokens"] += raw_tokens
+        _totals["sent_tokens"] += sent_tokens
+    return {"contexts": contexts, "report": report}
+
+def savings_stats():
+    """Returns the cumulative request and token counters for this process."""
+    with _lock:
+        stats = dict(_totals)
+    stats["saved_tokens"] = stats["raw_tokens"] - stats["sent_tokens"]
+    return stats
@@ -0,0 +1,117 @@
+# ----------- SANDBOX WORKER -----------
+# Started ahead of time by app/code_runner.py with the write end of a result pipe
+# as its only argument. Reads exactly one JSON job from stdin, runs it under the
+# job's resource limits with captured stdin/stdout/stderr and writes one JSON
+# result line to that pipe before exiting. A job either carries Python "code",
+# which runs in this interpreter, or an "argv" (e.g. a compiled binary), which runs
+# as this worker's only child so its rusage can be read back exactly. Everything
+# here is as untrusted as the code it runs: a worker sees one input and never the
+# expected output, and code_runner compares outputs itself.
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import traceback
+
+try:
+    import resource                       # POSIX only; limits are skipped elsewhere
+except ImportError:
+    resource = None
+
+
+def apply_limits(limits):
+    if resource is None:
+        return
+    cpu = int(limits["cpu_seconds"])
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    if limits["memory_mb"] is not None:  # None for runtimes like the JVM that reserve huge address space
+        memory = int(limits["memory_mb"]) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    file_size = int(limits["max_file_kb"]) * 1024
+    resource.setrlimit(resource.RLIMIT_FSIZE, (file_size, file_size))
+
+def peak_memory_kb(who="RUSAGE_SELF"):
+    if resource is None:
+        return None
+    return resource.getrusage(getattr(resource, who)).ru_maxrss  # Kilobytes on Linux
+
+def truncate(text, limit):
+    if len(text) <= limit:
+        return text
+    return text[:limit] + f"\n... output truncated ({len(text) - limit} more characters)"
+
+def run_code(job, limits):
+    real_stdout = sys.stdout
+    stdout, stderr = io.StringIO(), io.StringIO()
+
+    status, error = "ok", ""
+    started = time.perf_counter()
+    try:
+        code = compile(job["code"], "<candidate>", "exec")
+        apply_limits(limits)
+        sys.stdin, sys.stdout, sys.stderr = io.StringIO(job["input"]), stdout, stderr
+        exec(code, {"__name__": "__main__"})
+    except SystemExit:
+        pass
+    except MemoryError:
+        status, error = "memory_limit", "Memory limit exceeded."
+    except BaseException as e:
+        status = "error"
+        # Skip this worker's own frame so the traceback only shows the candidate's code
+        error = "".join(traceback.format_exception(type(e), e, e.__traceback__.tb_next))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, real_stdout, sys.__stderr__
+    return status, error, stdout.getvalue(), stderr.getvalue(), elapsed_ms, peak_memory_kb()
+
+def run_argv(job, limits):
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen(
+            job["argv"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            preexec_fn=(lambda: apply_limits(limits)) if resource else None,
+        )
+    except OSError as e:
+        return "error", f"Could not start program: {e}", "", "", 0.0, None
+    out, err = proc.communicate(job["input"].encode("utf-8"))  # code_runner enforces wall-clock time
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    status, error = "ok", ""
+    if proc.returncode in (-getattr(signal, "SIGXCPU", 24), -signal.SIGKILL):
+        status, error = "cpu_limit", f"CPU time limit of {limits['cpu_seconds']}s exceeded."
+    elif proc.returncode == -getattr(signal, "SIGXFSZ", 25):
+        status, error = "file_limit", f"File size limit of {limits['max_file_kb']} KB exceeded."
+    elif proc.returncode < 0:
+        status, error = "error", f"Program terminated by {signal.Signals(-proc.returncode).name}."
+    elif proc.returncode > 0:
+        status, error = "error", f"Program exited with code {proc.returncode}."
+    return (status, error, out.decode("utf-8", "replace"), err.decode("utf-8", "replace"),
+            elapsed_ms, peak_memory_kb("RUSAGE_CHILDREN"))
+
+def main():
+    result_pipe = os.fdopen(int(sys.argv[1]), "w", encoding="utf-8")
+    job = json.loads(sys.stdin.read())
+    limits = job["limits"]
+    runner = run_argv if "argv" in job else run_code
+
+    status, error, stdout, stderr, elapsed_ms, peak_kb = runner(job, limits)
+    max_output = int(limits["max_output_chars"])
+    result = {
+        "status": status,
+        "stdout": truncate(stdout, max_output),
+        "stderr": truncate(stderr, max_output),
+        "error": error,
+        "time_ms": elapsed_ms,
+        "peak_memory_kb": peak_kb,
+    }
+    result_pipe.write("\n" + json.dumps(result) + "\n")
+    result_pipe.close()
+
+
+if __name__ == "__main__":
+    main()
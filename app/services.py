@@ -0,0 +1,21 @@
+# ----------- IMPORTS -----------
+# Heavy client libraries are imported inside the factories, so the login page
+# never loads them; st.cache_resource builds each service once per server process.
+import os                                 # API key lookup
+import streamlit as st                    # Process-wide resource cache
+
+# ----------- CONSTANTS -----------
+LLM_MODEL = "gemini-2.0-flash"
+
+
+# ----------- SERVICES -----------
+@st.cache_resource(show_spinner=False)
+def get_llm():
+    """The shared Gemini chat model, constructed on first use."""
+    from langchain_google_genai import ChatGoogleGenerativeAI  # Gemini LLM
+    from pydantic import SecretStr                             # Secure API key handling
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise ValueError("❌ GOOGLE_API_KEY environment variable is not set.")
+    return ChatGoogleGenerativeAI(model=LLM_MODEL, api_key=SecretStr(api_key))
@@ -0,0 +1,175 @@
+# ----------- IMPORTS -----------
+import hashlib                            # Only hashes of session ids are stored
+import json                               # Field values are stored as JSON
+import os                                 # Backend selection
+import secrets                            # Session ids
+import threading                          # Guards the in-process backend
+import time                               # Expiry
+from collections import OrderedDict       # LRU ordering for the in-process backend
+from app.repository import connection     # Pooled SQLite connections
+
+# ----------- CONSTANTS -----------
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")  # "sqlite" (shared by replicas) or "memory"
+SESSION_TTL = 12 * 60 * 60                # Idle seconds before a server-side session is dropped
+MAX_MEMORY_SESSIONS = 10000               # Least recently used sessions beyond this are evicted
+PURGE_EVERY_SAVES = 500                   # How often the SQLite backend deletes expired rows
+
+HYDRATED_KEY = "_server_session_hydrated"  # st.session_state bookkeeping: field -> JSON as loaded
+ISSUED_FIELD = "_issued"                  # Stored for every id the server hands out; others are refused
+# The id travels only in this cookie, set by app.asgi.SessionCookieMiddleware. HttpOnly keeps it
+# away from page scripts, and it never appears in URLs that get shared, bookmarked or logged.
+COOKIE_NAME = "resumebot_sid"
+
+
+# ----------- BACKENDS -----------
+class MemorySessionBackend:
+    """Per-process LRU of {token: {field: json}}; fast, but not shared between replicas."""
+
+    def __init__(self, max_sessions=MAX_MEMORY_SESSIONS, ttl=SESSION_TTL):
+        self.max_sessions, self.ttl = max_sessions, ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, token, fields):
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(token)
+            if entry is None or entry[0] + self.ttl < now:
+                self._sessions.pop(token, None)
+                return {}
+            self._sessions.move_to_end(token)
+            return {field: entry[1][field] for field in fields if field in entry[1]}
+
+    def save(self, token, changes):
+        with self._lock:
+            _, values = self._sessions.pop(token, (None, {}))
+            values.update(changes)
+            self._sessions[token] = (time.time(), values)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+
+class SQLiteSessionBackend:
+    """One row per (token hash, field) in the main database, so any replica can serve a session."""
+
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._saves = 0
+
+    def load(self, token, fields):
+        if not fields:
+            return {}
+        placeholders = ", ".join("?" for _ in fields)
+        with connection() as conn:
+            rows = conn.execute(
+                f"SELECT field, value FROM session_fields "
+                f"WHERE token=? AND updated_at > ? AND field IN ({placeholders})",
+                (token, time.time() - self.ttl, *fields),
+            ).fetchall()
+        return dict(rows)
+
+    def save(self, token, changes):
+        now = time.time()
+        with connection() as conn:
+            conn.executemany(
+                "INSERT INTO session_fields (token, field, value, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(token, field) DO UPDATE SET value=excluded.value, updated_at=excluded.updated_at",
+                [(token, field, value, now) for field, value in changes.items()],
+            )
+            # Keep the untouched fields of an active session from expiring
+            conn.execute("UPDATE session_fields SET updated_at=? WHERE token=?", (now, token))
+            self._saves += 1
+            if self._saves % PURGE_EVERY_SAVES == 0:
+                conn.execute("DELETE FROM session_fields WHERE updated_at < ?", (now - self.ttl,))
+
+    def delete(self, token):
+        with connection() as conn:
+            conn.execute("DELETE FROM session_fields WHERE token=?", (token,))
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = MemorySessionBackend() if SESSION_BACKEND == "memory" else SQLiteSessionBackend()
+        return _backend
+
+
+# ----------- SESSION IDS -----------
+# Backends only ever see a SHA-256 of the id, so a copy of the store can't be
+# turned back into a cookie.
+def _key(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def issue_session_id():
+    """Creates a session id and records it as issued by this server."""
+    token = secrets.token_urlsafe(24)
+    get_backend().save(_key(token), {ISSUED_FIELD: "true"})
+    return token
+
+def is_issued(token):
+    """True for a live id this server issued; ids chosen by a client are never accepted."""
+    if not token or not isinstance(token, str):
+        return False
+    return ISSUED_FIELD in get_backend().load(_key(token), [ISSUED_FIELD])
+
+def cookie_header(token, secure):
+    """The Set-Cookie value carrying token; expires with the server-side session."""
+    header = f"{COOKIE_NAME}={token}; Path=/; Max-Age={SESSION_TTL}; HttpOnly; SameSite=Lax"
+    return header + "; Secure" if secure else header
+
+
+# ----------- STREAMLIT BINDING -----------
+def _encode(value):
+    try:
+        return json.dumps(value, sort_keys=True)
+    except (TypeError, ValueError):
+        return None  # Not serializable (e.g. an UploadedFile); kept in this browser session only
+
+def hydrate(state, token, fields):
+    """Loads the fields not yet loaded in this browser session into state.
+
+    Only the requested fields are read, so each page pays for what it touches.
+    Without an issued token nothing is loaded or persisted.
+    """
+    if token is None:
+        return
+    hydrated = state.setdefault(HYDRATED_KEY, {})
+    missing = [field for field in fields if field not in hydrated]
+    if not missing:
+        return
+    stored = get_backend().load(_key(token), missing)
+    for field in missing:
+        if field in stored:
+            state[field] = json.loads(stored[field])
+            hydrated[field] = stored[field]
+        else:
+            hydrated[field] = _encode(state.get(field))
+
+def persist(state, token):
+    """Writes back only the hydrated fields whose value changed during this run."""
+    if token is None:
+        return
+    hydrated = state.get(HYDRATED_KEY, {})
+    changes = {}
+    for field, loaded in hydrated.items():
+        current = _encode(state.get(field))
+        if current is not None and current != loaded:
+            changes[field] = current
+    if changes:
+        get_backend().save(_key(token), changes)
+        hydrated.update(changes)
+
+def forget(token):
+    """Drops every stored field; the id itself stays issued for this browser."""
+    if token is None:
+        return
+    get_backend().delete(_key(token))
+    get_backend().save(_key(token), {ISSUED_FIELD: "true"})
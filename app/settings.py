@@ -1,4 +1,5 @@
 import streamlit as st
+from app import credentials, images, repository
 
 def settings():
     st.header("⚙️ Settings")
@@ -8,13 +9,18 @@ def settings():
         st.subheader("🖼️ Change Profile Image")
     uploaded_file = st.file_uploader("Upload New Profile Image", type=["png", "jpg", "jpeg"])
     if uploaded_file:
-        st.session_state.profile_image = uploaded_file
-        st.success("✅ Profile image updated!")
+        try:
+            # Decoded once into content-addressed thumbnails; reruns with the same file are no-ops
+            content_hash = images.save_profile_image(uploaded_file.getvalue())
+        except OSError:
+            st.error("❌ That file is not a readable image.")
+        else:
+            if st.session_state.profile_image != content_hash:
+                st.session_state.profile_image = content_hash
+                repository.update_profile_picture(st.session_state.email, content_hash)
+                st.success("✅ Profile image updated!")
 
-    try:
-        st.image(st.session_state.profile_image, width=120)
-    except:
-        st.image("https://cdn-icons-png.flaticon.com/512/3135/3135715.png", width=120)
+    st.markdown(images.avatar_html(st.session_state.profile_image, "profile"), unsafe_allow_html=True)
 
     # Phone Number Update Section
     with st.container():
@@ -41,12 +47,12 @@ def settings():
             submitted = st.form_submit_button("Apply Changes")
 
             if submitted:
-                if current_password != st.session_state.password:
+                if not credentials.authenticate(st.session_state.email, current_password):
                     st.error("❌ Current password is incorrect.")
                 elif new_password != confirm_password:
                     st.error("❌ New passwords do not match.")
                 elif not new_password.strip():
                     st.warning("⚠️ New password cannot be empty.")
                 else:
-                    st.session_state.password = new_password
+                    credentials.set_password(st.session_state.email, new_password)
                     st.success("✅ Password updated successfully.")
@@ -0,0 +1,159 @@
+# ----------- IMPORTS -----------
+import re                                 # Combined alias matcher
+
+# ----------- TAXONOMY -----------
+# {category: {canonical name: aliases}}; categories mirror the skill extraction
+# prompt. The canonical name always matches itself, case-insensitively.
+TAXONOMY = {
+    "Programming Languages": {
+        "Python": ("python3", "py3"),
+        "Java": ("core java", "java se", "java ee", "j2ee"),
+        "C": (),
+        "C++": ("cpp", "c plus plus"),
+        "C#": ("c sharp", "csharp"),
+        "JavaScript": ("JS", "ecmascript", "es6"),
+        "TypeScript": ("TS",),
+        "Go": ("golang",),
+        "Rust": (),
+        "Kotlin": (),
+        "Swift": (),
+        "PHP": (),
+        "Ruby": (),
+        "R": (),
+        "Scala": (),
+        "MATLAB": (),
+        "Bash": ("shell scripting", "shell script"),
+        "Dart": (),
+    },
+    "Web Development": {
+        "HTML": ("html5",),
+        "CSS": ("css3",),
+        "React": ("react.js", "reactjs"),
+        "Angular": ("angularjs", "angular.js"),
+        "Vue.js": ("vue", "vuejs"),
+        "Next.js": ("nextjs",),
+        "Node.js": ("Node", "nodejs"),
+        "Express.js": ("Express", "expressjs"),
+        "Django": (),
+        "Flask": (),
+        "FastAPI": (),
+        "Spring Boot": ("Spring", "springboot"),
+        "ASP.NET": ("asp.net core", ".net core", ".net"),
+        "Laravel": (),
+        "Bootstrap": (),
+        "Tailwind CSS": ("tailwind", "tailwindcss"),
+        "jQuery": (),
+        "REST APIs": ("REST", "restful", "rest api", "restful apis", "rest apis"),
+        "GraphQL": (),
+        "Streamlit": (),
+    },
+    "Databases": {
+        "SQL": (),
+        "MySQL": (),
+        "PostgreSQL": ("postgres", "postgresql", "psql"),
+        "SQLite": ("sqlite3",),
+        "Oracle": ("oracle db", "oracle database", "pl/sql"),
+        "SQL Server": ("mssql", "ms sql", "microsoft sql server", "t-sql"),
+        "MongoDB": ("mongo",),
+        "Redis": (),
+        "Cassandra": (),
+        "Firebase": ("firestore",),
+        "DynamoDB": (),
+        "Elasticsearch": ("elastic search",),
+    },
+    "Data Science, Machine Learning, or AI tools": {
+        "Machine Learning": ("ML",),
+        "Deep Learning": ("DL",),
+        "NLP": ("natural language processing",),
+        "Computer Vision": ("opencv", "open cv"),
+        "TensorFlow": ("tensor flow",),
+        "Keras": (),
+        "PyTorch": ("Torch",),
+        "scikit-learn": ("sklearn", "scikit learn"),
+        "Pandas": (),
+        "NumPy": (),
+        "Matplotlib": (),
+        "Seaborn": (),
+        "Jupyter": ("jupyter notebook",),
+        "Power BI": ("powerbi",),
+        "Tableau": (),
+        "LangChain": (),
+        "Hugging Face": ("huggingface", "transformers"),
+        "Generative AI": ("genai", "gen ai", "llm", "llms", "large language models"),
+        "Data Analysis": ("data analytics",),
+    },
+}
+
+# Aliases that are also ordinary words or letters only count when written exactly
+# as listed ("C", "Go", "Spring", but not "c", "go" or "spring").
+CASE_SENSITIVE = {"C", "R", "Go", "JS", "TS", "ML", "DL", "REST", "Node", "Express", "Spring", "Torch",
+                  "Swift", "Rust", "Ruby", "Dart", "Oracle"}
+# Aliases that are everyday words even when capitalized ("Spring 2020", "Express delivery",
+# "Used Oracle."); they only count inside a list, e.g. "Java, Spring, Oracle" or "C/C++".
+AMBIGUOUS = {"c", "r", "go", "swift", "rust", "ruby", "dart", "spring", "express", "oracle", "node",
+             "torch", "flask", "transformers"}
+LIST_SEPARATORS = ",/|;:•·()[]"
+# The local list is trusted over the LLM only with this many skills from unambiguous
+# aliases, at least two of them on one line (a skills list rather than stray mentions).
+MIN_CONFIDENT_SKILLS = 3
+MIN_SKILLS_PER_LIST_LINE = 2
+
+
+# ----------- MATCHER -----------
+def _compile():
+    """Builds the alias index and one alternation over every alias, longest first."""
+    index, case_sensitive, insensitive = {}, set(), set()
+    for category, skills in TAXONOMY.items():
+        for canonical, aliases in skills.items():
+            for alias in (canonical, *aliases):
+                index[alias.lower()] = (canonical, category)
+                (case_sensitive if alias in CASE_SENSITIVE else insensitive).add(alias)
+    alternatives = [
+        f"(?-i:{re.escape(alias)})" if alias in case_sensitive else re.escape(alias)
+        for alias in sorted(case_sensitive | insensitive, key=len, reverse=True)
+    ]
+    # Boundaries treat +, # and . as part of a name, so "C" doesn't match inside "C++", "C#" or
+    # ".NET"; / separates names ("HTML/CSS", "C/C++") except in aliases such as "pl/sql"
+    pattern = re.compile(r"(?<![\w+#.-])(" + "|".join(alternatives) + r")(?![\w+#-]|\.\w)", re.IGNORECASE)
+    return index, pattern
+
+ALIAS_INDEX, SKILL_PATTERN = _compile()
+
+
+# ----------- EXTRACTION -----------
+def _in_list(text, start, end):
+    """True when the match is bounded by list separators or line edges on both sides."""
+    before = text[:start].rstrip(" \t")
+    after = text[end:].lstrip(" \t")
+    return (not before or before[-1] in LIST_SEPARATORS or before[-1] == "\n") and \
+           (not after or after[0] in LIST_SEPARATORS or after[0] == "\n")
+
+def extract_skills(text):
+    """Finds taxonomy skills in text without any network call.
+
+    Returns {"skills": [canonical names in order of appearance], "categories":
+    {category: [names]}, "confident": bool}; not confident means the evidence is
+    too thin (few distinctive names, no skills list) to trust over the LLM.
+    """
+    found, categories, strong, per_line = {}, {}, set(), {}
+    for match in SKILL_PATTERN.finditer(text):
+        alias = match.group(1).lower()
+        if alias in AMBIGUOUS and not _in_list(text, match.start(1), match.end(1)):
+            continue
+        canonical, category = ALIAS_INDEX[alias]
+        if alias not in AMBIGUOUS:
+            strong.add(canonical)
+            per_line.setdefault(text.count("\n", 0, match.start(1)), set()).add(canonical)
+        if canonical not in found:
+            found[canonical] = category
+            categories.setdefault(category, []).append(canonical)
+    listed = max((len(names) for names in per_line.values()), default=0)
+    return {
+        "skills": list(found),
+        "categories": categories,
+        "confident": len(strong) >= MIN_CONFIDENT_SKILLS and listed >= MIN_SKILLS_PER_LIST_LINE,
+    }
+
+def format_skills(result):
+    """The same comma-separated list the skill extraction prompt asks the LLM for."""
+    return ", ".join(result["skills"])
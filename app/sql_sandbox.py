@@ -0,0 +1,140 @@
+# ----------- IMPORTS -----------
+import sqlite3                            # In-memory SQL sandboxes
+import threading                          # Guards the shared templates while cloning
+import time                               # Statement deadlines
+
+# ----------- CONSTANTS -----------
+STATEMENT_TIMEOUT_SECONDS = 2             # Per-statement wall-clock budget
+PROGRESS_HANDLER_STEPS = 10000            # VM instructions between deadline checks
+MAX_RESULT_ROWS = 200                     # Rows returned per result set
+MAX_PAGE_COUNT = 4096                     # Caps each sandbox at 16 MB with 4 KB pages
+# Read-only schema introspection; every other PRAGMA is denied, since settings such
+# as max_page_count or writable_schema would lift the sandbox's limits
+ALLOWED_PRAGMAS = {"table_info", "table_xinfo", "table_list", "index_list", "index_info", "index_xinfo",
+                   "foreign_key_list"}
+
+# Seed scripts for the template databases. Each one is replayed exactly once per
+# process; candidates get a backup-API clone of the warm template instead.
+TEMPLATE_SEEDS = {
+    "empty": "",
+    "sample": """
+        CREATE TABLE departments (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL
+        );
+        CREATE TABLE employees (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            department_id INTEGER REFERENCES departments(id),
+            salary REAL,
+            hired_on TEXT
+        );
+        INSERT INTO departments (id, name) VALUES
+            (1, 'Engineering'), (2, 'Sales'), (3, 'HR');
+        INSERT INTO employees (name, department_id, salary, hired_on) VALUES
+            ('Asha', 1, 95000, '2021-03-01'),
+            ('Ravi', 1, 82000, '2022-07-15'),
+            ('Meena', 2, 60000, '2020-01-10'),
+            ('John', 2, 58000, '2023-02-20'),
+            ('Priya', 3, 52000, '2019-11-05');
+    """,
+}
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+# ----------- TEMPLATES -----------
+def _template(name):
+    """Returns the warm template database for name, seeding it on first use."""
+    with _templates_lock:
+        conn = _templates.get(name)
+        if conn is None:
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            conn.executescript(TEMPLATE_SEEDS[name])
+            _templates[name] = conn
+        return conn
+
+def _authorize(action, arg1, *args):
+    # ATTACH (and VACUUM INTO, which attaches) would let a query create or read files on the server
+    if action in (sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH):
+        return sqlite3.SQLITE_DENY
+    if action == sqlite3.SQLITE_PRAGMA and (arg1 or "").lower() not in ALLOWED_PRAGMAS:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+def new_database(template="sample"):
+    """Returns a fresh in-memory database cloned from a pre-seeded template."""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    source = _template(template)
+    with _templates_lock:
+        source.backup(conn)
+    conn.execute(f"PRAGMA max_page_count = {MAX_PAGE_COUNT}")
+    conn.set_authorizer(_authorize)
+    return conn
+
+
+# ----------- EXECUTION -----------
+def split_statements(sql):
+    """Splits a script into complete statements, respecting semicolons inside literals."""
+    statements, buffer = [], ""
+    for piece in sql.split(";"):
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip(" \t\r\n;"):
+                statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip(" \t\r\n;"):
+        statements.append(buffer.strip().rstrip(";"))
+    return statements
+
+def execute_sql(conn, sql, timeout=STATEMENT_TIMEOUT_SECONDS, max_rows=MAX_RESULT_ROWS):
+    """Runs a SQL script against conn and returns a code_runner-style result.
+
+    Every statement that produces rows adds an entry to "tables" with its
+    columns and (up to max_rows) rows. Statements running past timeout are
+    interrupted through the progress handler.
+    """
+    tables, messages = [], []
+    status, error = "ok", ""
+    started = time.perf_counter()
+
+    for statement in split_statements(sql):
+        deadline = time.monotonic() + timeout
+        conn.set_progress_handler(lambda: 1 if time.monotonic() > deadline else 0, PROGRESS_HANDLER_STEPS)
+        try:
+            cursor = conn.execute(statement)
+            if cursor.description is not None:
+                rows = cursor.fetchmany(max_rows + 1)
+                tables.append({
+                    "statement": statement,
+                    "columns": [column[0] for column in cursor.description],
+                    "rows": rows[:max_rows],
+                    "truncated": len(rows) > max_rows,
+                })
+            elif cursor.rowcount >= 0:
+                messages.append(f"{cursor.rowcount} row(s) affected.")
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            if time.monotonic() > deadline:
+                status, error = "timeout", f"Statement exceeded the {timeout}s limit:\n{statement}"
+            else:
+                status, error = "error", f"{e}\n{statement}"
+            break
+        except sqlite3.Error as e:
+            conn.rollback()
+            status, error = "error", f"{e}\n{statement}"
+            break
+        finally:
+            conn.set_progress_handler(None, 0)
+
+    return {
+        "status": status,
+        "stdout": "\n".join(messages),
+        "stderr": "",
+        "error": error,
+        "time_ms": (time.perf_counter() - started) * 1000,
+        "peak_memory_kb": None,
+        "tables": tables,
+    }
@@ -0,0 +1,61 @@
+# ----------- IMPORTS -----------
+import argparse                           # Command-line interface
+import os                                 # Run from the project root
+import re                                 # Parsing -X importtime output
+import subprocess                         # Fresh interpreter per measurement
+import sys                                # Interpreter path and exit status
+
+# ----------- CONSTANTS -----------
+# What a cold start imports before anyone logs in, and what the Dashboard adds on top
+LOGIN_PATH_MODULES = ["streamlit", "dotenv", "app.login", "app.profile", "app.uploads", "app.settings",
+                      "app.repository", "app.credentials", "app.session_store", "app.services"]
+DASHBOARD_MODULES = ["langchain_google_genai", "speech_recognition", "streamlit_ace", "pypdf",
+                     "app.chains", "app.resume_cache", "app.resume_sections", "app.skills", "app.llm_cache",
+                     "app.streaming", "app.compilers", "app.sql_sandbox", "app.grader", "app.pipeline",
+                     "app.transcription"]
+LOGIN_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))  # Fails the benchmark above this
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ----------- MEASUREMENT -----------
+def import_times(modules, preloaded=()):
+    """Imports modules in a fresh interpreter under -X importtime.
+
+    Returns ({top-level module: cumulative microseconds}, [error lines]); modules in
+    `preloaded` are imported first and not counted, so their dependencies are free.
+    """
+    setup = "".join(f"try:\n    import {name}\nexcept Exception:\n    pass\n" for name in preloaded)
+    code = setup + "import sys\nsys.stderr.write('--- measure ---\\n')\n" + "".join(
+        f"try:\n    import {name}\nexcept Exception as e:\n    print('{name}: ' + repr(e))\n" for name in modules
+    )
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=PROJECT_ROOT)
+    stderr = proc.stderr.split("--- measure ---\n", 1)[-1]
+    totals = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:  # Depth 1: imported directly, not as a dependency
+            totals[match.group(4)] = int(match.group(2))
+    return totals, [line for line in proc.stdout.splitlines() if line]
+
+def report(title, totals, errors, top=10):
+    total_ms = sum(totals.values()) / 1000
+    print(f"{title}: {total_ms:.0f} ms")
+    for name, micros in sorted(totals.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+    for line in errors:
+        print(f"  not importable: {line}")
+    return total_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report cold-start import cost of the login and Dashboard paths.")
+    parser.add_argument("--budget-ms", type=float, default=LOGIN_BUDGET_MS,
+                        help="Exit non-zero when the login path imports take longer than this")
+    args = parser.parse_args()
+    login_ms = report("Login path", *import_times(LOGIN_PATH_MODULES))
+    report("Dashboard adds", *import_times(DASHBOARD_MODULES, preloaded=LOGIN_PATH_MODULES))
+    if login_ms > args.budget_ms:
+        print(f"Login path import time {login_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget.")
+        sys.exit(1)
@@ -0,0 +1,34 @@
+# ----------- IMPORTS -----------
+import os                                 # Environment configuration
+import time                               # Flush throttling
+
+# ----------- CONSTANTS -----------
+# Seconds between placeholder redraws while tokens arrive; each redraw is a websocket message
+STREAM_FLUSH_INTERVAL = float(os.getenv("STREAM_FLUSH_INTERVAL", "0.1"))
+CURSOR = "▌"
+
+
+# ----------- RENDERING -----------
+def feedback_box(text):
+    return f"<div class='feedback-box'>{text}</div>"
+
+def throttled(chunks, flush_interval=STREAM_FLUSH_INTERVAL):
+    """Accumulates chunks and yields the text so far at most once per flush_interval.
+
+    The final, complete text is always yielded last.
+    """
+    text, last_flush = "", 0.0
+    for chunk in chunks:
+        text += chunk
+        now = time.monotonic()
+        if now - last_flush >= flush_interval:
+            last_flush = now
+            yield text, False
+    yield text, True
+
+def render_stream(placeholder, chunks, flush_interval=STREAM_FLUSH_INTERVAL, wrap=feedback_box):
+    """Renders chunks into a Streamlit placeholder as they arrive and returns the full text."""
+    text = ""
+    for text, done in throttled(chunks, flush_interval):
+        placeholder.markdown(wrap(text if done else text + CURSOR), unsafe_allow_html=True)
+    return text
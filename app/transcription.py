@@ -0,0 +1,281 @@
+# ----------- IMPORTS -----------
+import hashlib                            # Job ids from audio content
+import io                                 # Wrap uploaded bytes for AudioFile
+import math                               # Frame energy
+import operator                           # Fast sum of squares
+import os                                 # Backend and pool configuration
+import threading                          # Guards the job table
+import wave                               # Splitting recordings into chunks
+from array import array                   # 16-bit PCM samples
+from collections import OrderedDict, deque  # Bounded job table, chunks waiting for a worker
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor  # Transcription workers
+
+# ----------- CONSTANTS -----------
+# Tried in order; a backend that is unreachable or not installed falls through to the next.
+# "sphinx" (pocketsphinx) and "whisper" (openai-whisper) run locally with no network.
+TRANSCRIBE_BACKENDS = [name.strip() for name in os.getenv("TRANSCRIBE_BACKENDS", "google,sphinx").split(",")]
+# Shared by every session. Chunks are handed out round-robin between recordings as
+# workers free up: a recording alone gets every worker, and a new one gets the next
+# free worker instead of queueing behind a long answer.
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", "4"))
+MAX_CHUNKS_PER_JOB = 40                   # About 5-10 minutes of speech; the rest is not transcribed
+# "thread" suits network backends; "process" keeps CPU-bound local engines off the server's GIL
+TRANSCRIBE_EXECUTOR = os.getenv("TRANSCRIBE_EXECUTOR", "thread")
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+MAX_TRACKED_JOBS = 1000
+EXPIRED_MESSAGE = "This recording expired; please record again."
+
+# Voice activity segmentation: chunks are cut in pauses, so words aren't split
+VAD_FRAME_MS = 30
+MIN_CHUNK_SECONDS = 4.0                   # Don't cut before a chunk is this long...
+MAX_CHUNK_SECONDS = 15.0                  # ...and always cut once it is this long
+MIN_PAUSE_SECONDS = 0.35                  # Silence needed for a cut
+SILENCE_FLOOR_RMS = 200                   # Frames quieter than this are never speech
+NOISE_FACTOR = 2.0                        # Speech is this much louder than the noise floor...
+SPEECH_FRACTION = 0.25                    # ...or at least this share of the loud frames' level
+
+_jobs = OrderedDict()                     # job id -> _Job
+_jobs_lock = threading.Lock()
+_executor = None
+_dispatcher = None                        # Segments recordings and hands chunks to _executor
+_ready = deque()                          # Jobs with cut chunks waiting for a worker, in turn order
+_running = 0                              # Chunks in _executor
+_schedule_lock = threading.Lock()
+
+
+# ----------- BACKENDS -----------
+class BackendUnavailable(Exception):
+    """The backend can't run here (not installed, no network); try the next one."""
+
+
+def _recognize_google(recognizer, audio):
+    import speech_recognition as sr
+    try:
+        return recognizer.recognize_google(audio)
+    except sr.RequestError as e:
+        raise BackendUnavailable(f"google: {e}") from e
+
+def _recognize_sphinx(recognizer, audio):
+    import speech_recognition as sr
+    try:
+        return recognizer.recognize_sphinx(audio)
+    except sr.RequestError as e:  # Raised when pocketsphinx is not installed
+        raise BackendUnavailable(f"sphinx: {e}") from e
+
+def _recognize_whisper(recognizer, audio):
+    try:
+        return recognizer.recognize_whisper(audio, model=WHISPER_MODEL, language="english").strip()
+    except (ImportError, AttributeError) as e:  # openai-whisper missing or an older SpeechRecognition
+        raise BackendUnavailable(f"whisper: {e}") from e
+
+BACKENDS = {
+    "google": _recognize_google,
+    "sphinx": _recognize_sphinx,
+    "whisper": _recognize_whisper,
+}
+
+
+def transcribe(audio_bytes, backends=None):
+    """Transcribes WAV/AIFF/FLAC bytes with the first backend that can run.
+
+    Returns {"text", "backend"}. Raises ValueError when the speech is not
+    understood and RuntimeError when no backend is available.
+    """
+    import speech_recognition as sr
+
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(io.BytesIO(audio_bytes)) as source:
+        audio = recognizer.record(source)
+    unavailable = []
+    for name in backends or TRANSCRIBE_BACKENDS:
+        try:
+            return {"text": BACKENDS[name](recognizer, audio), "backend": name}
+        except BackendUnavailable as e:
+            unavailable.append(str(e))
+        except sr.UnknownValueError:
+            raise ValueError("Voice not recognized.")
+    raise RuntimeError("No speech recognition backend is available (" + "; ".join(unavailable) + ").")
+
+
+# ----------- SEGMENTATION -----------
+def segment(samples, rate, channels=1):
+    """Yields (start, end) sample offsets of speech chunks, cut in the pauses between phrases.
+
+    Energy-based VAD: a 30 ms frame is speech when its RMS is well above the
+    recording's noise floor. Chunks without any speech are skipped.
+    """
+    frame = max(1, rate * VAD_FRAME_MS // 1000) * channels
+    energies = []
+    for start in range(0, len(samples), frame):
+        chunk = samples[start:start + frame]
+        energies.append(math.sqrt(sum(map(operator.mul, chunk, chunk)) / len(chunk)))
+    if not energies:
+        return
+    ranked = sorted(energies)
+    noise_floor, loud = ranked[len(ranked) // 20], ranked[len(ranked) * 19 // 20]
+    # Above the noise, but never so high that a recording with few pauses looks silent
+    threshold = max(SILENCE_FLOOR_RMS, min(noise_floor * NOISE_FACTOR, loud * SPEECH_FRACTION))
+    frames_per_second = 1000 / VAD_FRAME_MS
+    min_frames, max_frames = MIN_CHUNK_SECONDS * frames_per_second, MAX_CHUNK_SECONDS * frames_per_second
+    pause_frames = MIN_PAUSE_SECONDS * frames_per_second
+
+    chunk_start, silent_run, voiced = 0, 0, False
+    for index, energy in enumerate(energies):
+        if energy > threshold:
+            voiced, silent_run = True, 0
+        else:
+            silent_run += 1
+        length = index + 1 - chunk_start
+        if (length >= min_frames and silent_run >= pause_frames) or length >= max_frames:
+            cut = index + 1 - silent_run // 2  # Middle of the pause
+            if voiced:
+                yield chunk_start * frame, cut * frame
+            chunk_start, silent_run, voiced = cut, index + 1 - cut, False
+    if voiced:
+        yield chunk_start * frame, len(samples)
+
+def _chunks(audio_bytes):
+    """Splits a 16-bit PCM WAV into speech chunks (as WAV bytes); other formats stay whole."""
+    try:
+        with wave.open(io.BytesIO(audio_bytes)) as source:
+            params = source.getparams()
+            pcm = source.readframes(params.nframes)
+    except (wave.Error, EOFError):
+        yield audio_bytes  # AIFF/FLAC: transcribed as one piece
+        return
+    if params.sampwidth != 2:
+        yield audio_bytes
+        return
+    samples = array("h", pcm)
+    for start, end in segment(samples, params.framerate, params.nchannels):
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as chunk:
+            chunk.setparams(params)
+            chunk.writeframes(samples[start:end].tobytes())
+        yield buffer.getvalue()
+
+
+# ----------- JOB QUEUE -----------
+class _Job:
+    """The ordered chunk futures of one recording; filled while it is being segmented."""
+
+    def __init__(self):
+        self.futures = []                 # Submitted chunks, in order
+        self.waiting = deque()            # Cut chunks not yet submitted
+        self.segmented = False
+        self.truncated = False            # Longer than MAX_CHUNKS_PER_JOB
+
+def _pools():
+    global _executor, _dispatcher
+    if _executor is None:
+        pool_class = ProcessPoolExecutor if TRANSCRIBE_EXECUTOR == "process" else ThreadPoolExecutor
+        _executor = pool_class(max_workers=TRANSCRIBE_WORKERS)
+        _dispatcher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="transcribe-dispatch")
+    return _executor, _dispatcher
+
+def _schedule(executor):
+    # Fills free workers, taking one chunk per waiting job in turn
+    global _running
+    submitted = []
+    with _schedule_lock:
+        while _ready and _running < TRANSCRIBE_WORKERS:
+            job = _ready.popleft()
+            future = executor.submit(transcribe, job.waiting.popleft(), TRANSCRIBE_BACKENDS)
+            job.futures.append(future)
+            if job.waiting:
+                _ready.append(job)
+            _running += 1
+            submitted.append(future)
+    for future in submitted:  # Outside the lock: the callback runs at once if already done
+        future.add_done_callback(lambda _: _chunk_finished(executor))
+
+def _chunk_finished(executor):
+    global _running
+    with _schedule_lock:
+        _running -= 1
+    _schedule(executor)
+
+def _dispatch(job, audio_bytes, executor):
+    # Chunks start transcribing as soon as they are cut, before the rest is segmented
+    try:
+        for index, chunk in enumerate(_chunks(audio_bytes)):
+            if index == MAX_CHUNKS_PER_JOB:
+                job.truncated = True
+                break
+            with _schedule_lock:
+                job.waiting.append(chunk)
+                if len(job.waiting) == 1:  # Otherwise it already has its turn in _ready
+                    _ready.append(job)
+            _schedule(executor)
+    finally:
+        job.segmented = True
+
+def submit(audio_bytes):
+    """Queues a recording for chunked, parallel transcription and returns its job id at once.
+
+    The id is derived from the audio, so the same recording seen again on a rerun
+    maps to the existing job instead of being transcribed twice.
+    """
+    job_id = hashlib.sha256(audio_bytes).hexdigest()[:16]
+    with _jobs_lock:
+        if job_id in _jobs:
+            _jobs.move_to_end(job_id)
+            return job_id
+        executor, dispatcher = _pools()
+        job = _jobs[job_id] = _Job()
+        dispatcher.submit(_dispatch, job, audio_bytes, executor)
+        while len(_jobs) > MAX_TRACKED_JOBS:
+            _jobs.popitem(last=False)
+    return job_id
+
+def result(job_id):
+    """Returns the transcript so far, stitched in chunk order.
+
+    {"status": "pending"|"done"|"partial"|"error"|"expired", "text", "backend",
+    "error", "chunks_done", "chunks_total", "chunks_failed"}; while pending, text
+    holds the finished chunks up to the first one still running or failed, so it
+    never has a hole in the middle. "partial" is a finished transcript with gaps
+    (chunks that failed, or a recording cut at MAX_CHUNKS_PER_JOB) and error says
+    what is missing.
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:  # Never submitted here, or dropped from the job table
+        return {"status": "expired", "text": "", "backend": None, "error": EXPIRED_MESSAGE,
+                "chunks_done": 0, "chunks_total": 0, "chunks_failed": 0}
+    with _schedule_lock:
+        segmented, futures, waiting = job.segmented, list(job.futures), len(job.waiting)
+    texts, prefix, errors, backend, done = [], None, [], None, 0
+    for future in futures:
+        if not future.done():
+            prefix = len(texts) if prefix is None else prefix
+            continue
+        done += 1
+        error = future.exception()
+        if error is None:
+            texts.append(future.result()["text"])
+            backend = future.result()["backend"]
+        elif not isinstance(error, ValueError):  # ValueError: a chunk with no words in it
+            errors.append(str(error))
+            prefix = len(texts) if prefix is None else prefix
+    total = len(futures) + waiting
+    error = ""
+    if not segmented or done < total:
+        status = "pending"
+    elif not texts:
+        status = "error"
+        error = errors[0] if errors else "Voice not recognized."
+    elif errors or job.truncated:
+        status = "partial"
+        gaps = []
+        if errors:
+            gaps.append(f"{len(errors)} of {total} parts couldn't be transcribed ({errors[0]})")
+        if job.truncated:
+            gaps.append(f"only the first {MAX_CHUNKS_PER_JOB} parts of a long recording were transcribed")
+        error = "Your transcript is incomplete: " + "; ".join(gaps) + "."
+    else:
+        status = "done"
+    if status == "pending" and prefix is not None:
+        texts = texts[:prefix]
+    return {"status": status, "text": " ".join(texts), "backend": backend, "error": error,
+            "chunks_done": done, "chunks_total": total, "chunks_failed": len(errors)}
@@ -1,21 +1,39 @@
 import streamlit as st
+from app import repository
+
+PAGE_SIZE = 20  # Uploads fetched per "Load more" click
 
 def uploads():
     # Display the header for the upload history section
     st.header("🕓 Recent Upload History")
-    
+    email = st.session_state.email
+
+    # Pages loaded so far in this session; further pages are only fetched on request
+    if "upload_pages" not in st.session_state:
+        st.session_state.upload_pages = [repository.list_uploads(email, limit=PAGE_SIZE)]
+    pages = st.session_state.upload_pages
+    rows = [row for page in pages for row in page]
+
     # Create an expandable section to show or hide the upload history
     with st.expander("📁 View Uploads"):
-        # Check if there is any upload history stored in session state
-        if st.session_state.upload_history:
-            # Iterate over the upload history in reverse order (most recent first)
-            for i, item in enumerate(reversed(st.session_state.upload_history), 1):
-                # Display each uploaded file's name and timestamp
-                st.write(f"{i}. 📄 {item['filename']} - ⏱️ {item['timestamp']}")
-            
+        if rows:
+            # Render the loaded entries (most recent first) as a single element
+            st.markdown("\n".join(
+                f"{i}. 📄 {filename} - ⏱️ {uploaded_at}"
+                for i, (_, filename, uploaded_at) in enumerate(rows, 1)
+            ))
+            st.caption(f"Showing {len(rows)} of {repository.count_uploads(email)} uploads")
+
+            # Keyset pagination: continue after the last (uploaded_at, id) shown
+            if len(pages[-1]) == PAGE_SIZE and st.button("⬇️ Load more"):
+                last_id, _, last_uploaded_at = rows[-1]
+                pages.append(repository.list_uploads(email, after=(last_uploaded_at, last_id), limit=PAGE_SIZE))
+                st.rerun()
+
             # Provide a button to clear the upload history
             if st.button("🧹 Clear History"):
-                st.session_state.upload_history.clear()  # Clear the list
+                repository.clear_uploads(email)
+                st.session_state.pop("upload_pages", None)
                 st.success("✅ Upload history cleared.")  # Show success message
         else:
             # Show a message when there are no uploads yet
@@ -1,32 +1,28 @@
 # ---------------- Import core libraries ----------------
+# Only what the login page needs is imported here. LangChain, Gemini, PDF parsing,
+# speech recognition and the code editor load on the first Dashboard render
+# (see show_interview_dashboard); `python -m app.startup_benchmark` reports the cost.
+import os                                     # Editor update mode
+import secrets                                # Per-tab login ids when there is no session cookie
 import streamlit as st                        # Streamlit for web UI
 from datetime import datetime                 # For timestamps on uploads
-import os                                     # For environment variables
 from dotenv import load_dotenv                # Load .env for API keys
-from pypdf import PdfReader                   # PDF text extraction
-from langchain.chains import LLMChain         # LangChain workflow
-from langchain_google_genai import ChatGoogleGenerativeAI  # Gemini LLM
-from pydantic import SecretStr                # Secure API key handling
-from langchain.prompts import PromptTemplate  # LLM prompt templates
-import speech_recognition as sr               # Voice recognition
-import re                                     # Regex for skill extraction
-import streamlit_ace                           # Online code editor
 
 # ---------------- Import custom pages ----------------
 from app.login import login
 from app.profile import profile
 from app.uploads import uploads
 from app.settings import settings
+from app.repository import init_schema, record_upload  # Pooled SQLite data access
+from app.credentials import session_email, end_login  # Logins bound to the session id
+from app import session_store                # Server-side session persistence
+from app.services import get_llm             # Lazily constructed, process-wide LLM client
+from app.images import avatar_html            # Cacheable, pre-sized profile thumbnails
 
 # ---------------- App configuration ----------------
 st.set_page_config(page_title="ResumeBot - AI Interview Coach", page_icon="🤖")
 load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
-if not api_key:
-    raise ValueError("❌ GOOGLE_API_KEY environment variable is not set.")
-
-# ---------------- Initialize Gemini LLM ----------------
-llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", api_key=SecretStr(api_key))
+init_schema()  # Runs the DDL once per server process, not on every login render
 
 # ---------------- Default session state ----------------
 default_session = {
@@ -35,25 +31,58 @@ default_session = {
     "email": "",
     "phone": "",
     "account_type": "User",
-    "password": "",
-    "profile_image": "https://cdn-icons-png.flaticon.com/512/3135/3135715.png",
-    "upload_history": [],
+    "profile_image": None,  # None shows the bundled default avatar (static/default_avatar.svg)
     "questions": None,
+    "extracted_skills": "",
+    "coding_questions": "",
+    "resume_sha": None,
+    "resume_token_report": None,
+    "test_cases": {},
     "voice_answer": ""
 }
 for k, v in default_session.items():
     st.session_state.setdefault(k, v)
 
+# ---------------- Server-side session ----------------
+# The session id is a server-issued HttpOnly cookie (set by server.py), so a reconnect,
+# a new tab or another replica behind the load balancer picks the same state back up.
+# Each page lists the fields it reads; only those are loaded from the store.
+AUTH_FIELDS = ["logged_in", "username", "email", "phone", "account_type", "profile_image", "page_id"]
+PAGE_FIELDS = {
+    "Dashboard": ["questions", "extracted_skills", "coding_questions", "resume_sha",
+                  "resume_token_report", "test_cases", "voice_answer"],
+    "Profile": [],
+    "Uploads": [],
+    "Settings": [],
+}
+st.query_params.pop("sid", None)  # Ids used to travel in the URL; drop them from old links
+sid = st.context.cookies.get(session_store.COOKIE_NAME)
+if not session_store.is_issued(sid):
+    sid = None  # Missing, expired or not issued by us: this browser session is not persisted
+session_store.hydrate(st.session_state, sid, AUTH_FIELDS)
+# Logins are bound to the session id (hashed in the login store), never to a token kept in
+# session state; without a cookie the login lasts as long as this browser tab's session.
+st.session_state.login_id = sid or st.session_state.setdefault("tab_login_id", secrets.token_urlsafe(32))
+
 # ---------------- Login check ----------------
+# A live login skips re-checking the password (and the KDF) on every rerun. Restored
+# state alone never logs anyone in: an expired or revoked login means logging in again.
+if st.session_state.logged_in and session_email(st.session_state.login_id) != st.session_state.email:
+    for key in AUTH_FIELDS:
+        st.session_state[key] = default_session.get(key)
+    st.session_state.page_id = "Dashboard"
 if not st.session_state.logged_in:
-    login()
+    try:
+        login()
+    finally:
+        session_store.persist(st.session_state, sid)
     st.stop()
 
 # ---------------- Sidebar with profile ----------------
 with st.sidebar:
     st.markdown(f"""
     <div style="text-align: center;">
-        <img src="{st.session_state.profile_image}" width="100">
+        {avatar_html(st.session_state.profile_image, "sidebar")}
         <h4 style="margin-top: 10px; text-decoration: underline;">{st.session_state.username}</h4>
     </div>
     """, unsafe_allow_html=True)
@@ -74,229 +103,354 @@ for name, pid in sections:
 
 st.sidebar.markdown("<hr>", unsafe_allow_html=True)
 if st.sidebar.button("🚪 Logout", use_container_width=True):
+    end_login(st.session_state.login_id)
+    session_store.forget(sid)
     for key in list(st.session_state.keys()):
         del st.session_state[key]
     st.rerun()
 
 page = st.session_state["page_id"]
+session_store.hydrate(st.session_state, sid, PAGE_FIELDS.get(page, []))
+
+# ---------------- Code Editor ----------------
+ACE_LANGUAGES = {
+    "Python": "python",
+    "C": "c_cpp",
+    "C++": "c_cpp",
+    "Java": "java",
+    "SQL": "sql",
+    "HTML": "html",
+    "JavaScript": "javascript",
+}
+# "live" sends the code ~200 ms after typing pauses (rerunning only the coding panel);
+# "manual" sends it only on Ctrl+Enter / Apply, so typing costs the server nothing.
+CODE_EDITOR_MODES = ("live", "manual")
+CODE_EDITOR_UPDATES = os.getenv("CODE_EDITOR_UPDATES", "live").strip().lower()
+if CODE_EDITOR_UPDATES not in CODE_EDITOR_MODES:
+    raise ValueError(f"CODE_EDITOR_UPDATES must be one of {', '.join(CODE_EDITOR_MODES)}, "
+                     f"not {CODE_EDITOR_UPDATES!r}")
+
+# ---------------- Code Run Results ----------------
+def show_run_result(result):
+    """Renders a code runner result with its output and performance stats."""
+    stats = []
+    if result.get("time_ms") is not None:
+        stats.append(f"⏱️ {result['time_ms']:.1f} ms")
+    if result.get("peak_memory_kb"):
+        stats.append(f"🧠 {result['peak_memory_kb'] / 1024:.1f} MB peak")
+    if result["status"] == "ok":
+        st.success("✅ Code executed successfully!" + (f"  ({' · '.join(stats)})" if stats else ""))
+    elif result["status"] == "busy":
+        st.warning(f"⏳ {result['error']}")
+    elif result["status"] == "unsupported":
+        st.warning(f"⚙️ {result['error']}")
+    elif result["status"] == "compile_error":
+        st.error("❌ Compilation failed.")
+    else:
+        st.error(f"❌ Error during execution: {result['error']}")
+    for table in result.get("tables", []):
+        st.markdown(f"**📊 Result:** `{table['statement']}`")
+        st.dataframe([dict(zip(table["columns"], row)) for row in table["rows"]], use_container_width=True)
+        if table["truncated"]:
+            st.caption(f"Showing the first {len(table['rows'])} rows.")
+    if result.get("stdout"):
+        st.markdown("**📤 Output:**")
+        st.code(result["stdout"], language="text")
+    if result.get("stderr"):
+        st.markdown("**⚠️ Errors:**")
+        st.code(result["stderr"], language="text")
+
+def show_grading_result(result):
+    """Renders a batch grading result; test inputs stay hidden from the candidate."""
+    if "cases" not in result:
+        show_run_result(result)  # The batch as a whole failed (compile error, busy, limits)
+        return
+    summary = f"{result['passed']}/{result['total']} tests passed in {result['time_ms']:.1f} ms"
+    if result["passed"] == result["total"]:
+        st.success(f"✅ {summary}")
+    else:
+        st.error(f"❌ {summary}")
+    st.dataframe(
+        [
+            {
+                "Test": f"#{case['case']}",
+                "Result": "✅ Passed" if case["passed"] else f"❌ {case['status'].replace('_', ' ').title()}",
+                "Time (ms)": round(case["time_ms"], 2),
+            }
+            for case in result["cases"]
+        ],
+        use_container_width=True,
+    )
+    first_error = next((case["error"] for case in result["cases"] if case["error"]), "")
+    if first_error:
+        st.code(first_error, language="text")
+
+# ---------------- Dashboard Panels ----------------
+# Each panel is a fragment: its widgets rerun only that panel, not the resume
+# parsing, sidebar and analysis above it. Panels share values via session state.
+@st.fragment
+def question_panel(questions):
+    st.selectbox("👉 Select a question to answer:", questions, key="interview_question")
+    st.text_area("✍️ Type your Answer:", key="typed_answer")
+
+@st.fragment(run_every=1)
+def voice_transcript_panel():
+    """Polls the background transcription job, showing chunks as they finish, then
+    hands the complete text to the full page."""
+    from app import transcription
+    job_id = st.session_state.voice_job
+    status = transcription.result(job_id)
+    if status["status"] == "pending":
+        progress = f" ({status['chunks_done']}/{status['chunks_total']} parts)" if status["chunks_total"] else ""
+        st.info(f"📝 Transcribing your answer...{progress}")
+        st.session_state.voice_answer = status["text"]  # Finished chunks, stitched in order
+        st.write(status["text"])
+        return
+    st.session_state.voice_job_applied = job_id
+    # "partial" keeps the text it has and says what is missing; "expired" asks for a new recording
+    st.session_state.voice_error = status["error"]
+    if status["status"] in ("done", "partial"):
+        st.session_state.voice_answer = status["text"]
+    st.rerun()  # Once per recording: stops the polling and shows the final transcript
+
+@st.fragment
+def voice_panel():
+    from app import transcription                # Background speech-to-text jobs
+    st.markdown("### 🎙️ OR Record your Voice Answer")
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        # Recorded in the candidate's browser and transcribed off the script thread
+        recording = st.audio_input("🎤 Record")
+        if recording is not None:
+            st.session_state.voice_job = transcription.submit(recording.getvalue())
+    with col2:
+        job_id = st.session_state.get("voice_job")
+        if job_id and st.session_state.get("voice_job_applied") != job_id:
+            voice_transcript_panel()  # Polls until the transcript is ready
+        else:
+            if st.session_state.get("voice_error"):
+                if st.session_state.get("voice_answer"):
+                    st.warning(st.session_state.voice_error)
+                else:
+                    st.error(st.session_state.voice_error)
+            st.write(st.session_state.get("voice_answer", ""))
+
+@st.fragment
+def feedback_panel():
+    from app import chains                       # Registered, instrumented prompt chains
+    from app.streaming import render_stream      # Token-by-token feedback rendering
+    if st.button("🚀 Get Feedback"):
+        # Read at click time, so edits in the other panels don't need to rerun this one
+        question = st.session_state.get("interview_question")
+        final_answer = st.session_state.get("voice_answer") or st.session_state.get("typed_answer")
+        if final_answer:
+            st.markdown("### 📋 Feedback:")
+            render_stream(st.empty(), chains.answer_feedback(get_llm(), question, final_answer))
+        else:
+            st.warning("Provide an answer by text or voice.")
+
+@st.fragment
+def coding_panel(extracted_skills, question_list):
+    """Question, editors and Run / Test / Feedback; every keystroke that reaches the
+    server (see CODE_EDITOR_UPDATES) reruns only this panel."""
+    import streamlit_ace                          # Online code editor
+    from app import chains                       # Registered, instrumented prompt chains
+    from app.streaming import render_stream      # Token-by-token feedback rendering
+    from app.compilers import run_code           # Sandboxed multi-language compile & run
+    from app.sql_sandbox import new_database, execute_sql  # Per-session in-memory SQL sandbox
+    from app.grader import GRADABLE_LANGUAGES, generate_test_cases, grade_submission  # Batch test grading
+
+    # Step 3: Dropdown for question selection
+    selected_question = st.selectbox("🎯 Select a Question to Solve:", question_list, key="coding_question")
+
+    # Step 4: Language selection
+    selected_lang = st.selectbox(
+        "Choose Language:",
+        ["Python", "C", "C++", "Java", "SQL", "HTML", "JavaScript"],
+        key="coding_language",
+    )
+
+    # Step 5: White-themed ACE code editor
+    st.markdown("**✍️ Write Your Code Below:**")
+    live_updates = CODE_EDITOR_UPDATES == "live"
+    code_input = streamlit_ace.st_ace(
+        placeholder=f"Write your {selected_lang} code here...",
+        language=ACE_LANGUAGES.get(selected_lang, "plain_text"),
+        theme="xcode",       # ✅ White background editor
+        key="code_editor",
+        height=300,
+        font_size=15,
+        tab_size=4,
+        wrap=True,
+        auto_update=live_updates,
+    )
+    if not live_updates:
+        st.caption("⌨️ Press Ctrl+Enter (⌘+Enter) or Apply to send your code before running it.")
+
+    # Step 6: Input editor for test data
+    st.markdown("**📥 Provide Input (if your code uses input()):**")
+    input_data = streamlit_ace.st_ace(
+        placeholder="Type program inputs here (one per line)...",
+        language="plain_text",
+        theme="xcode",
+        key="input_editor",
+        height=120,
+        font_size=14,
+        tab_size=4,
+        wrap=True,
+    )
+
+    if selected_lang == "SQL":
+        st.caption("🗄️ SQL runs against a private sample database with `employees` and `departments` tables.")
+        if st.button("🔄 Reset SQL Database"):
+            st.session_state.sql_db = new_database("sample")
+
+    # Step 7: Run / Test / Feedback buttons
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        run_clicked = st.button("▶️ Run Code")
+    with col2:
+        tests_clicked = st.button("🧪 Run Tests")
+    with col3:
+        feedback_clicked = st.button("💡 Get AI Feedback")
+    stop_on_failure = st.checkbox("Stop at first failing test", value=False)
+
+    # Step 8: Run code in the sandboxed runner (compiled builds are cached)
+    if run_clicked:
+        if selected_lang == "SQL":
+            # One sandbox per session, so tables created in one run are there for the next
+            if st.session_state.get("sql_db") is None:
+                st.session_state.sql_db = new_database("sample")
+            show_run_result(execute_sql(st.session_state.sql_db, code_input or ""))
+        elif selected_lang == "HTML":
+            st.warning("⚙️ HTML can't be executed; use AI Feedback to review it.")
+        else:
+            with st.spinner("Running your code..."):
+                result = run_code(selected_lang, code_input or "", input_data or "")
+            show_run_result(result)
+
+    # Step 9: Grade against hidden test cases in one batch
+    if tests_clicked:
+        if selected_lang not in GRADABLE_LANGUAGES:
+            st.warning(f"⚙️ Automatic tests are not available for {selected_lang}.")
+        elif not (code_input or "").strip():
+            st.warning("✍️ Please enter your code before running tests.")
+        else:
+            if selected_question not in st.session_state.test_cases:
+                with st.spinner("Preparing hidden test cases..."):
+                    st.session_state.test_cases[selected_question] = generate_test_cases(get_llm(), selected_question)
+            cases = st.session_state.test_cases[selected_question]
+            if cases:
+                with st.spinner(f"Running {len(cases)} tests..."):
+                    result = grade_submission(selected_lang, code_input, cases, stop_on_failure)
+                show_grading_result(result)
+            else:
+                st.warning("⚠️ Couldn't prepare test cases for this question. Try Run Code instead.")
+
+    # Step 10: AI feedback for code
+    if feedback_clicked:
+        if (code_input or "").strip():
+            st.markdown("### 📋 AI Feedback on Your Code:")
+            render_stream(st.empty(), chains.code_feedback(get_llm(), selected_question, code_input, extracted_skills))
+        else:
+            st.warning("✍️ Please enter your code before requesting feedback.")
 
 # ---------------- Dashboard ----------------
 def show_interview_dashboard():
+    # Heavy dependencies, imported on the first Dashboard render (cached in sys.modules after)
+    from app.resume_cache import parse_resume    # Cached PDF text extraction
+    from app.llm_cache import cache_stats        # Memoized LLM call counters
+    from app import chains                       # Registered, instrumented prompt chains
+    from app.pipeline import generate_interview_material  # Concurrent resume analysis
+    from app.resume_sections import prepare_resume  # Section-aware, token-budgeted resume context
+
     st.title("🤖 ResumeBot - AI Interview Coach")
     st.write("Upload your resume and practice interview questions with text, voice, or coding!")
 
     # ---------------- Resume Upload ----------------
     uploaded_file = st.file_uploader("📄 Upload your resume (PDF)", type="pdf")
     if uploaded_file:
-        pdf_reader = PdfReader(uploaded_file)
-        resume_text = "".join([page.extract_text() for page in pdf_reader.pages if page.extract_text()])
-
-        # Track upload history
-        st.session_state.upload_history.append({
-            "filename": uploaded_file.name,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
+        parsed_resume = parse_resume(uploaded_file)  # Parsed once per unique file, reused on reruns
 
         # ---------------- AI Interview Questions ----------------
-        if st.session_state.questions is None:
-            prompt = PromptTemplate(
-                input_variables=["resume_text"],
-                template="Based on the following resume, generate 10 relevant interview questions:\n{resume_text}"
-            )
-            chain = LLMChain(llm=llm, prompt=prompt)
-            st.session_state.questions = chain.run(resume_text=resume_text)
-
         st.subheader("🎯 Interview Questions:")
+        questions_slot = st.empty()
+        progress_slot = st.empty()
+
+        # Questions and skills run concurrently; coding questions wait only on skills
+        if st.session_state.resume_sha != parsed_resume["sha256"]:
+            # Track upload history once per new file, deduplicated by content hash
+            record_upload(st.session_state.email, uploaded_file.name, parsed_resume["sha256"],
+                          datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            st.session_state.pop("upload_pages", None)
+
+            def show_partial(name, value):
+                if name in ("questions", "questions_partial"):
+                    questions_slot.write([q for q in value.split("\n") if q.strip()])
+                elif name == "skills" and value:
+                    progress_slot.info(f"🧠 Detected Skills: {value} — generating coding questions...")
+
+            progress_slot.info("⏳ Analyzing your resume...")
+            # Each prompt gets only the sections it needs, within its token budget
+            resume = prepare_resume(parsed_resume["text"])
+            st.session_state.resume_token_report = resume["report"]
+            results = generate_interview_material(get_llm(), resume["contexts"], on_result=show_partial)
+            st.session_state.questions = results["questions"]
+            st.session_state.extracted_skills = results["skills"]
+            st.session_state.coding_questions = results["coding_questions"]
+            st.session_state.resume_sha = parsed_resume["sha256"]
+            progress_slot.empty()
+
         questions = [q for q in st.session_state.questions.split("\n") if q.strip()]
-        st.write(questions)
+        questions_slot.write(questions)
+        report = st.session_state.resume_token_report
+        if report and report["raw_tokens"]:
+            st.caption(f"✂️ Resume context: ~{report['sent_tokens']} tokens sent instead of "
+                       f"~{report['raw_tokens']} ({report['saved_tokens'] * 100 // report['raw_tokens']}% saved)")
 
-        selected_question = st.selectbox("👉 Select a question to answer:", questions)
-        user_answer = st.text_area("✍️ Type your Answer:")
+        question_panel(questions)
 
         # ---------------- Voice Answer ----------------
-        st.markdown("### 🎙️ OR Record your Voice Answer")
-        col1, col2 = st.columns([1, 5])
-        with col1:
-            if st.button("🎤 Record"):
-                recognizer = sr.Recognizer()
-                with sr.Microphone() as source:
-                    st.info("Listening...")
-                    try:
-                        audio = recognizer.listen(source, timeout=5)
-                        text = recognizer.recognize_google(audio)
-                        st.success(f"You said: {text}")
-                        st.session_state.voice_answer = text
-                    except:
-                        st.error("Voice not recognized.")
-        with col2:
-            st.write(st.session_state.get("voice_answer", ""))
-
-        final_answer = st.session_state.get("voice_answer") or user_answer
+        voice_panel()
 
         # ---------------- Feedback ----------------
-        if st.button("🚀 Get Feedback"):
-            if final_answer:
-                feedback_prompt = PromptTemplate(
-                    input_variables=["question", "answer"],
-                    template="""
-                    Question: {question}
-                    Candidate's Answer: {answer}
-                    Provide professional feedback on relevance, clarity, and improvement.
-                    """
-                )
-                feedback_chain = LLMChain(llm=llm, prompt=feedback_prompt)
-                feedback = feedback_chain.run(question=selected_question, answer=final_answer)
-                st.markdown("### 📋 Feedback:")
-                st.markdown(f"<div class='feedback-box'>{feedback}</div>", unsafe_allow_html=True)
-            else:
-                st.warning("Provide an answer by text or voice.")
+        feedback_panel()
 
        # ---------------- Programming Questions & Online Compiler ----------------
         st.subheader("💻 Programming Questions Section")
 
-        # Step 1: Extract skills using Gemini LLM
-        skill_extraction_prompt = PromptTemplate(
-            input_variables=["resume_text"],
-            template="""
-            Analyze the following resume text and extract technical skills in these categories:
-            - Programming Languages (Python, C, C++, Java, etc.)
-            - Web Development (HTML, CSS, JavaScript, Django, Flask, etc.)
-            - Databases (MySQL, SQL, PostgreSQL, etc.)
-            - Data Science, Machine Learning, or AI tools.
-
-            Return them as a comma-separated list only.
-            Resume Text:
-            {resume_text}
-            """
-        )
-        extract_chain = LLMChain(llm=llm, prompt=skill_extraction_prompt)
-        extracted_skills = extract_chain.run(resume_text=resume_text).strip()
+        # Step 1: Skills extracted by the resume pipeline above
+        extracted_skills = st.session_state.extracted_skills
 
         if extracted_skills:
             st.info(f"🧠 Detected Skills: {extracted_skills}")
 
-            # Step 2: Generate skill-based coding & SQL questions
-            question_prompt = PromptTemplate(
-                input_variables=["skills"],
-                template="""
-                Generate 10 short, practical, and resume-based coding or SQL interview questions 
-                based on these skills: {skills}.
-
-                Include:
-                - Basic logic programs (even/odd, factorial, palindrome)
-                - String or array handling
-                - File handling or exception handling (for Python/Java)
-                - SQL tasks (CREATE TABLE, INSERT, SELECT queries)
-                - Web-related small tasks (HTML/CSS/JS) if relevant
-
-                Each question should be skill-relevant and returned on a new line.
-                """
-            )
-            q_chain = LLMChain(llm=llm, prompt=question_prompt)
-            coding_questions = q_chain.run(skills=extracted_skills)
+            # Step 2: Skill-based coding & SQL questions from the same pipeline
+            coding_questions = st.session_state.coding_questions
             question_list = [q.strip() for q in coding_questions.split("\n") if q.strip()]
-
-            # Step 3: Dropdown for question selection
-            selected_question = st.selectbox("🎯 Select a Question to Solve:", question_list)
-
-            # Step 4: Language selection
-            selected_lang = st.selectbox(
-                "Choose Language:",
-                ["Python", "C", "C++", "Java", "SQL", "HTML", "JavaScript"]
-            )
-
-            # Step 5: White-themed ACE code editor
-            st.markdown("**✍️ Write Your Code Below:**")
-            code_input = streamlit_ace.st_ace(
-                placeholder=f"Write your {selected_lang} code here...",
-                language="python" if selected_lang.lower() == "python" else "sql",
-                theme="xcode",       # ✅ White background editor
-                key="code_editor",
-                height=300,
-                font_size=15,
-                tab_size=4,
-                wrap=True,
-                auto_update=True,
-            )
-
-            # Step 6: Input editor for test data
-            st.markdown("**📥 Provide Input (if your code uses input()):**")
-            input_data = streamlit_ace.st_ace(
-                placeholder="Type program inputs here (one per line)...",
-                language="plain_text",
-                theme="xcode",
-                key="input_editor",
-                height=120,
-                font_size=14,
-                tab_size=4,
-                wrap=True,
-            )
-
-            # Step 7: Run / Feedback buttons
-            col1, col2 = st.columns([1, 1])
-            with col1:
-                run_clicked = st.button("▶️ Run Code")
-            with col2:
-                feedback_clicked = st.button("💡 Get AI Feedback")
-
-            # Step 8: Run code for Python only
-            if run_clicked:
-                if selected_lang == "Python":
-                    try:
-                        import io, sys
-                        sys.stdin = io.StringIO(input_data)  # Feed input() values
-                        exec_globals = {}
-                        exec(code_input, exec_globals)
-                        st.success("✅ Code executed successfully!")
-                    except Exception as e:
-                        st.error(f"❌ Error during execution: {e}")
-                elif selected_lang == "SQL":
-                    st.info("ℹ️ SQL execution requires a connected database (not included in this demo).")
-                else:
-                    st.warning("⚙️ Code execution currently supports only Python.")
-
-            # Step 9: AI feedback for code
-            if feedback_clicked:
-                if code_input.strip():
-                    feedback_prompt = PromptTemplate(
-                        input_variables=["question", "code", "skills"],
-                        template="""
-                        Evaluate the candidate's code based on the given question and skills.
-                        Provide detailed feedback covering:
-                        - Logic correctness
-                        - Code efficiency
-                        - Readability and maintainability
-                        - Suggestions for improvement
-
-                        Skills: {skills}
-                        Question: {question}
-                        Candidate Code:
-                        {code}
-                        """
-                    )
-                    feedback_chain = LLMChain(llm=llm, prompt=feedback_prompt)
-                    feedback = feedback_chain.run(
-                        question=selected_question,
-                        code=code_input,
-                        skills=extracted_skills
-                    )
-                    st.markdown("### 📋 AI Feedback on Your Code:")
-                    st.markdown(f"<div class='feedback-box'>{feedback}</div>", unsafe_allow_html=True)
-                else:
-                    st.warning("✍️ Please enter your code before requesting feedback.")
+            coding_panel(extracted_skills, question_list)
         else:
             st.warning("⚠️ No technical skills detected in the uploaded resume.")
 
+        # ---------------- LLM Cache Stats ----------------
+        stats = cache_stats()
+        st.caption(f"🗄️ LLM cache: {stats['hits']} hits / {stats['misses']} misses")
+        with st.expander("📈 LLM chain metrics"):
+            st.dataframe(chains.chain_stats(), use_container_width=True)
+
 
 # ---------------- Page Routing ----------------
-if page == "Dashboard":
-    show_interview_dashboard()
-elif page == "Profile":
-    profile()
-elif page == "Uploads":
-    uploads()
-elif page == "Settings":
-    settings()
+try:
+    if page == "Dashboard":
+        show_interview_dashboard()
+    elif page == "Profile":
+        profile()
+    elif page == "Uploads":
+        uploads()
+    elif page == "Settings":
+        settings()
+finally:
+    session_store.persist(st.session_state, sid)  # Also runs when a handler calls st.rerun()
 
 # ---------------- Footer ----------------
 st.markdown("""
@@ -1,9 +1,9 @@
 import streamlit as st
-import smtplib
 import time
 import random
 import string
-from email.mime.text import MIMEText
+from app import mailer  # Background SMTP dispatch; credentials come from .env
+from app import rate_limit  # Resend cooldown shared by every tab and replica
 
 # ---------------------------- Email OTP Setup ----------------------------
 
@@ -11,31 +11,36 @@ def generate_otp(length=6):
     return ''.join(random.choices(string.digits, k=length))
 
 def send_email_otp(receiver_email, otp):
-    sender_email = "sarathsarath53381@gmail.com"
-    sender_password = "Sarath9843@#"  # App password if 2FA is on
-    subject = "Your OTP Verification Code"
-    body = f"Your OTP is: {otp}\nIt will expire in 5 minutes."
-
-    msg = MIMEText(body)
-    msg["Subject"] = subject
-    msg["From"] = sender_email
-    msg["To"] = receiver_email
-
-    try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(sender_email, sender_password)
-            server.send_message(msg)
-        return True
-    except Exception as e:
-        st.error(f"Failed to send email: {e}")
+    # Queued for the background sender; the page keeps rendering while SMTP runs
+    message_id = mailer.send_otp(receiver_email, otp)
+    if message_id is None:
+        st.error("Mail service is busy. Please try again in a moment.")
         return False
+    st.session_state.otp_message_id = message_id
+    return True
+
+@st.fragment(run_every=2)
+def delivery_status_panel():
+    # Polls the dispatcher without rerunning the whole page
+    message_id = st.session_state.get("otp_message_id")
+    if message_id is None:
+        return
+    status = mailer.delivery_status(message_id)
+    if status["status"] == "sent":
+        st.caption("📬 OTP email delivered to the mail server.")
+    elif status["status"] == "failed":
+        st.error(f"Failed to send email: {status['error']}")
+    elif status["status"] == "retrying":
+        st.caption(f"⏳ Mail server unavailable, retrying (attempt {status['attempts']})...")
+    else:
+        st.caption("⏳ Sending OTP email...")
 
 def is_otp_expired():
     return time.time() - st.session_state.get("otp_sent_time", 0) > 300  # 5 minutes
 
-def can_resend():
-    return time.time() - st.session_state.get("last_resend_time", 0) > 60  # 1 min cooldown
+def send_wait(email):
+    # 1 min cooldown per address (plus a per-IP cap), enforced server-side
+    return rate_limit.hit("send_otp", email=email, ip=rate_limit.client_ip(st.context))
 
 # ---------------------------- Main App ----------------------------
 
@@ -48,28 +53,31 @@ if "email_verified" not in st.session_state:
 if "otp" not in st.session_state:
     st.session_state.otp = ""
     st.session_state.otp_attempts = 0
-    st.session_state.last_resend_time = 0
 
 email = st.text_input("Enter your email to receive OTP", key="email_input")
 
 # Send OTP
 if st.button("Send OTP"):
-    if email:
+    if email and (wait := send_wait(email)):
+        st.warning(rate_limit.wait_message(wait))
+    elif email:
         st.session_state.otp = generate_otp()
         if send_email_otp(email, st.session_state.otp):
             st.session_state.otp_sent_time = time.time()
             st.session_state.otp_attempts = 0
-            st.session_state.last_resend_time = time.time()
-            st.success("OTP sent to your email.")
+            st.success("OTP queued for your email.")
     else:
         st.warning("Please enter a valid email address.")
 
 # OTP Verification
 if st.session_state.otp:
+    delivery_status_panel()
     otp_input = st.text_input("Enter OTP", max_chars=6)
 
     if st.button("Verify OTP"):
-        if is_otp_expired():
+        if wait := rate_limit.hit("verify_otp", email=email, ip=rate_limit.client_ip(st.context)):
+            st.error(rate_limit.wait_message(wait))
+        elif is_otp_expired():
             st.error("❌ OTP expired. Please resend.")
         elif otp_input == st.session_state.otp:
             st.success("✅ OTP verified successfully.")
@@ -82,15 +90,14 @@ if st.session_state.otp:
 
     # Resend OTP
     if st.button("Resend OTP"):
-        if can_resend():
+        if wait := send_wait(email):
+            st.warning(rate_limit.wait_message(wait))
+        else:
             st.session_state.otp = generate_otp()
             if send_email_otp(email, st.session_state.otp):
                 st.session_state.otp_sent_time = time.time()
                 st.session_state.otp_attempts = 0
-                st.session_state.last_resend_time = time.time()
                 st.success("OTP resent successfully.")
-        else:
-            st.warning("Please wait 60 seconds before resending OTP.")
 
 # Show verified status
 if st.session_state.email_verified:
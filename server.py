@@ -0,0 +1,13 @@
+# ---------------- ASGI entry point ----------------
+# Start the app with `streamlit run server.py` (or `uvicorn server:app`). It runs
+# main.py inside an st.App with the HTTP middleware from app/asgi.py, which plain
+# `streamlit run main.py` can't add (no session cookie, so nothing is persisted).
+import os                                     # Locating main.py
+import streamlit as st                        # st.App (Streamlit >= 1.65)
+from starlette.middleware import Middleware   # Middleware registration
+from app.asgi import SessionCookieMiddleware, StaticCacheMiddleware  # Session cookie, static cache headers
+
+app = st.App(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py"),
+    middleware=[Middleware(SessionCookieMiddleware), Middleware(StaticCacheMiddleware)],
+)
@@ -0,0 +1,29 @@
+from app.chains import estimate_tokens
+from app.resume_sections import PROMPT_CONTEXTS, fit, prepare_resume
+
+ONE_LINE_RESUME = " ".join(
+    f"Built data pipeline number {i} in Python and SQL for the analytics team." for i in range(600)
+)
+
+
+def test_fit_cuts_an_overlong_first_line_at_a_word_boundary():
+    text = fit(ONE_LINE_RESUME, 100)
+    assert text
+    assert estimate_tokens(text) <= 100
+    assert ONE_LINE_RESUME.startswith(text)
+    assert ONE_LINE_RESUME[len(text)] == " "
+
+
+def test_fit_keeps_whole_lines_and_cuts_the_one_that_overflows():
+    text = fit("Jane Doe\n" + ONE_LINE_RESUME, 50)
+    first, second = text.split("\n")
+    assert first == "Jane Doe"
+    assert second and ONE_LINE_RESUME.startswith(second)
+    assert estimate_tokens(text) <= 50
+
+
+def test_single_line_resume_longer_than_the_budget_gets_context_for_every_prompt():
+    contexts = prepare_resume(ONE_LINE_RESUME)["contexts"]
+    for prompt, (_, budget) in PROMPT_CONTEXTS.items():
+        assert contexts[prompt]
+        assert estimate_tokens(contexts[prompt]) <= budget